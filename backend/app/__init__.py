@@ -17,9 +17,25 @@ def create_app(config_name='production'):
     # Load configuration
     app.config.from_object(config[config_name])
 
+    # Time pool checkouts so /api/metrics/pool can report wait times
+    from app.metrics import TimedQueuePool, instrument_pool, instrument_requests
+    engine_options = dict(app.config.get('SQLALCHEMY_ENGINE_OPTIONS', {}))
+    if 'pool_size' in engine_options:
+        engine_options.setdefault('poolclass', TimedQueuePool)
+    app.config['SQLALCHEMY_ENGINE_OPTIONS'] = engine_options
+
     # Initialize extensions
     db.init_app(app)
+    with app.app_context():
+        instrument_pool(db.engine)
+        instrument_requests(app, db.engine)
+        if db.engine.dialect.name == 'sqlite':
+            from app.sqlite import configure_sqlite
+            configure_sqlite(db.engine, app.config['SQLITE_PRAGMAS'])
     jwt = JWTManager(app)
+
+    from app.user_loader import register_user_loader
+    register_user_loader(jwt)
     
     # CRITICAL: Configure CORS to allow frontend domain
     # Allow all origins for development, restrict in production if needed
@@ -27,9 +43,9 @@ def create_app(config_name='production'):
         r"/api/*": {
             "origins": "*",  # Allow all origins for now - restrict in production
             "methods": ["GET", "POST", "PUT", "DELETE", "OPTIONS", "PATCH"],
-            "allow_headers": ["Content-Type", "Authorization"],
+            "allow_headers": ["Content-Type", "Authorization", "If-None-Match"],
             "supports_credentials": True,
-            "expose_headers": ["Content-Type", "Authorization"]
+            "expose_headers": ["Content-Type", "Authorization", "ETag"]
         }
     })
 
@@ -48,12 +64,26 @@ def create_app(config_name='production'):
     from app.tasks import tasks_bp
     from app.user import user_bp
     from app.achievements import achievements_bp
+    from app.sync import sync_bp
+    from app.export import export_bp
+    from app.importer import import_bp
+    from app.calendar import calendar_bp
+    from app.tags import tags_bp
+    from app.search import search_bp
+    from app.metrics import metrics_bp
 
     app.register_blueprint(auth_bp, url_prefix='/api')
     app.register_blueprint(planners_bp, url_prefix='/api')
     app.register_blueprint(tasks_bp, url_prefix='/api')
     app.register_blueprint(user_bp, url_prefix='/api')
     app.register_blueprint(achievements_bp, url_prefix='/api')
+    app.register_blueprint(sync_bp, url_prefix='/api')
+    app.register_blueprint(export_bp, url_prefix='/api')
+    app.register_blueprint(import_bp, url_prefix='/api')
+    app.register_blueprint(calendar_bp, url_prefix='/api')
+    app.register_blueprint(tags_bp, url_prefix='/api')
+    app.register_blueprint(search_bp, url_prefix='/api')
+    app.register_blueprint(metrics_bp, url_prefix='/api')
     
     # Error handlers
     @app.errorhandler(404)
@@ -78,7 +108,15 @@ def create_app(config_name='production'):
                 'planners': '/api/planners/*',
                 'tasks': '/api/tasks/*',
                 'user': '/api/user/*',
-                'achievements': '/api/achievements/*'
+                'achievements': '/api/achievements/*',
+                'sync': '/api/sync',
+                'export': '/api/export',
+                'import': '/api/import',
+                'calendar': '/api/calendar',
+                'tags': '/api/tags',
+                'search': '/api/search',
+                'metrics': '/metrics',
+                'pool': '/api/metrics/pool'
             },
             'frontend': 'https://seu-planner-frontend.onrender.com',
             'docs': 'https://github.com/andreajoa/SEU-PLANNER'
@@ -88,12 +126,10 @@ def create_app(config_name='production'):
     @app.route('/api/health')
     def health():
         return jsonify({'status': 'healthy', 'version': '1.0.0'})
-    
-    # Initialize database
-    with app.app_context():
-        db.create_all()
-        # Initialize default achievements
-        from app.achievements import init_achievements
-        init_achievements()
-    
+
+    # Schema and seed data are handled by `flask bootstrap` (see init_db.py),
+    # so creating the app never touches the database
+    from app.cli import register_commands
+    register_commands(app)
+
     return app
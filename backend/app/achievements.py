@@ -1,6 +1,9 @@
-from flask import Blueprint, request, jsonify
-from flask_jwt_extended import jwt_required, get_jwt_identity
-from models import db, User, Achievement, UserAchievement
+from flask import Blueprint, jsonify
+from flask_jwt_extended import jwt_required, get_jwt_identity, get_current_user
+from models import db, Achievement, UserAchievement
+from app.leaderboard import leaderboard
+from app.gamification import get_catalog, unlock, unlock_reached
+from app.etag import conditional
 
 achievements_bp = Blueprint('achievements', __name__)
 
@@ -38,23 +41,22 @@ def initialize_achievements():
 
 @achievements_bp.route('/achievements', methods=['GET'])
 @jwt_required()
+@conditional(version=lambda: get_catalog().version)
 def get_achievements():
     """Get all achievements"""
     try:
         user_id = get_jwt_identity()
 
-        # Get all achievements
-        achievements = Achievement.query.all()
-
         # Get user's unlocked achievements
-        user_achievements = UserAchievement.query.filter_by(user_id=user_id).all()
-        unlocked_ids = {ua.achievement_id for ua in user_achievements}
+        unlocked_ids = set(db.session.execute(
+            db.select(UserAchievement.achievement_id).filter_by(user_id=user_id)
+        ).scalars())
 
         # Mark which achievements are unlocked
         achievements_data = []
-        for ach in achievements:
-            ach_dict = ach.to_dict()
-            ach_dict['unlocked'] = ach.id in unlocked_ids
+        for ach in get_catalog().ordered:
+            ach_dict = dict(ach)
+            ach_dict['unlocked'] = ach['id'] in unlocked_ids
             achievements_data.append(ach_dict)
 
         return jsonify({
@@ -70,54 +72,17 @@ def check_achievements():
     """Check and unlock new achievements"""
     try:
         user_id = get_jwt_identity()
-        user = User.query.get(user_id)
+        user = get_current_user()
 
         if not user:
             return jsonify({'error': 'User not found'}), 404
 
-        # Get all achievements
-        achievements = Achievement.query.all()
-
         # Get user's unlocked achievements
-        user_achievements = UserAchievement.query.filter_by(user_id=user_id).all()
-        unlocked_ids = {ua.achievement_id for ua in user_achievements}
-
-        newly_unlocked = []
-
-        for achievement in achievements:
-            # Skip if already unlocked
-            if achievement.id in unlocked_ids:
-                continue
-
-            # Check if requirements are met
-            unlocked = False
-            if achievement.requirement_type == 'tasks_completed':
-                unlocked = user.tasks_completed >= achievement.requirement_value
-            elif achievement.requirement_type == 'streak':
-                unlocked = user.streak >= achievement.requirement_value
-            elif achievement.requirement_type == 'level':
-                unlocked = user.level >= achievement.requirement_value
-            elif achievement.requirement_type == 'planners_created':
-                unlocked = (user.planners_created or 0) >= achievement.requirement_value
-
-            # Unlock achievement
-            if unlocked:
-                user_achievement = UserAchievement(
-                    user_id=user_id,
-                    achievement_id=achievement.id
-                )
-                db.session.add(user_achievement)
-
-                # Award XP
-                user.xp += achievement.xp_reward
-                user.total_xp += achievement.xp_reward
-
-                newly_unlocked.append(achievement.to_dict())
-
-        # Level up logic
-        new_level = (user.total_xp // 100) + 1
-        if new_level > user.level:
-            user.level = new_level
+        unlocked_ids = set(db.session.execute(
+            db.select(UserAchievement.achievement_id).filter_by(user_id=user_id)
+        ).scalars())
+
+        newly_unlocked = unlock_reached(user_id, unlocked_ids)
 
         db.session.commit()
 
@@ -138,12 +103,22 @@ def get_user_achievements():
     try:
         user_id = get_jwt_identity()
 
-        user_achievements = UserAchievement.query.filter_by(user_id=user_id).order_by(
-            UserAchievement.unlocked_at.desc()
+        rows = db.session.execute(
+            db.select(
+                UserAchievement.id, UserAchievement.user_id,
+                UserAchievement.achievement_id, UserAchievement.unlocked_at
+            ).filter_by(user_id=user_id).order_by(UserAchievement.unlocked_at.desc())
         ).all()
 
+        # Achievement details come from the cached catalog, not a query per row
+        catalog = get_catalog()
         return jsonify({
-            'achievements': [ua.to_dict() for ua in user_achievements]
+            'achievements': [{
+                'id': row.id,
+                'user_id': row.user_id,
+                'achievement': catalog.by_id.get(row.achievement_id),
+                'unlocked_at': row.unlocked_at.isoformat() if row.unlocked_at else None
+            } for row in rows]
         }), 200
 
     except Exception as e:
@@ -155,45 +130,26 @@ def unlock_achievement(achievement_id):
     """Unlock a specific achievement"""
     try:
         user_id = get_jwt_identity()
-        user = User.query.get(user_id)
+        user = get_current_user()
 
         if not user:
             return jsonify({'error': 'User not found'}), 404
 
-        achievement = Achievement.query.get(achievement_id)
+        achievement = get_catalog().by_id.get(achievement_id)
         if not achievement:
             return jsonify({'error': 'Achievement not found'}), 404
 
-        # Check if already unlocked
-        existing = UserAchievement.query.filter_by(
-            user_id=user_id,
-            achievement_id=achievement_id
-        ).first()
-
-        if existing:
+        # Unlock and award XP; an existing unlock is left alone
+        unlocked, _ = unlock(user_id, [achievement_id])
+        if not unlocked:
+            db.session.rollback()
             return jsonify({'message': 'Achievement already unlocked'}), 200
 
-        # Unlock achievement
-        user_achievement = UserAchievement(
-            user_id=user_id,
-            achievement_id=achievement_id
-        )
-        db.session.add(user_achievement)
-
-        # Award XP
-        user.xp += achievement.xp_reward
-        user.total_xp += achievement.xp_reward
-
-        # Level up logic
-        new_level = (user.total_xp // 100) + 1
-        if new_level > user.level:
-            user.level = new_level
-
         db.session.commit()
 
         return jsonify({
             'message': 'Achievement unlocked!',
-            'achievement': achievement.to_dict(),
+            'achievement': achievement,
             'user': user.to_dict()
         }), 200
 
@@ -206,11 +162,10 @@ def unlock_achievement(achievement_id):
 def get_leaderboard():
     """Get leaderboard"""
     try:
-        users = User.query.order_by(User.total_xp.desc()).limit(10).all()
-
-        return jsonify({
-            'leaderboard': [u.to_dict() for u in users]
-        }), 200
+        user_id = get_jwt_identity()
+        return jsonify(leaderboard(user_id)), 200
 
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
     except Exception as e:
         return jsonify({'error': str(e)}), 500
@@ -1,7 +1,7 @@
 from flask import Blueprint, request, jsonify
-from flask_jwt_extended import create_access_token, create_refresh_token, jwt_required, get_jwt_identity
+from flask_jwt_extended import create_access_token, create_refresh_token, jwt_required, get_jwt_identity, current_user
 from models import db, User
-import bcrypt
+from app.passwords import PasswordHasherBusy, hash_password, check_password, needs_rehash
 
 auth_bp = Blueprint('auth', __name__)
 
@@ -26,7 +26,7 @@ def register():
             return jsonify({'error': 'Email already registered'}), 400
 
         # Create user
-        password_hash = bcrypt.hashpw(password.encode('utf-8'), bcrypt.gensalt()).decode('utf-8')
+        password_hash = hash_password(password)
         user = User(
             email=email,
             username=username,
@@ -46,6 +46,9 @@ def register():
             'refresh_token': refresh_token
         }), 201
 
+    except PasswordHasherBusy as e:
+        db.session.rollback()
+        return jsonify({'error': str(e)}), 503, {'Retry-After': '1'}
     except Exception as e:
         db.session.rollback()
         return jsonify({'error': str(e)}), 500
@@ -67,9 +70,18 @@ def login():
             return jsonify({'error': 'Invalid credentials'}), 401
 
         # Check password
-        if not bcrypt.checkpw(password.encode('utf-8'), user.password_hash.encode('utf-8')):
+        if not check_password(password, user.password_hash):
             return jsonify({'error': 'Invalid credentials'}), 401
 
+        # Upgrade hashes made with a different work factor
+        if needs_rehash(user.password_hash):
+            try:
+                user.password_hash = hash_password(password)
+                db.session.commit()
+            except PasswordHasherBusy:
+                # Keep the old hash; the upgrade happens on a later login
+                db.session.rollback()
+
         # Create tokens
         access_token = create_access_token(identity=user.id)
         refresh_token = create_refresh_token(identity=user.id)
@@ -81,7 +93,11 @@ def login():
             'refresh_token': refresh_token
         }), 200
 
+    except PasswordHasherBusy as e:
+        db.session.rollback()
+        return jsonify({'error': str(e)}), 503, {'Retry-After': '1'}
     except Exception as e:
+        db.session.rollback()
         return jsonify({'error': str(e)}), 500
 
 @auth_bp.route('/auth/me', methods=['GET'])
@@ -89,8 +105,7 @@ def login():
 def get_current_user():
     """Get current authenticated user"""
     try:
-        user_id = get_jwt_identity()
-        user = User.query.get(user_id)
+        user = current_user
 
         if not user:
             return jsonify({'error': 'User not found'}), 404
@@ -0,0 +1,91 @@
+from datetime import date, datetime, timedelta
+from flask import Blueprint, request, jsonify
+from flask_jwt_extended import jwt_required, get_jwt_identity
+from sqlalchemy import and_, case, func, select
+from models import db, Task
+from app.etag import conditional
+from app.serializers import TASK_COLUMNS, task_serializer, json_response
+
+calendar_bp = Blueprint('calendar', __name__)
+
+MAX_RANGE_DAYS = 400
+OPEN_STATUSES = ('pending', 'in_progress')
+
+class InvalidRange(ValueError):
+    """Raised when from/to are missing, malformed or too far apart"""
+
+def _midnight(day):
+    return datetime.combine(day, datetime.min.time())
+
+def parse_range(args):
+    """Inclusive from/to dates from the query string"""
+    try:
+        start = date.fromisoformat(args['from'])
+        end = date.fromisoformat(args['to'])
+    except KeyError:
+        raise InvalidRange('from and to are required (YYYY-MM-DD)')
+    except ValueError:
+        raise InvalidRange('from and to must be dates (YYYY-MM-DD)')
+
+    if end < start:
+        raise InvalidRange('to must not be before from')
+    if (end - start).days >= MAX_RANGE_DAYS:
+        raise InvalidRange(f'Range is limited to {MAX_RANGE_DAYS} days')
+    return start, end
+
+def day_counts(filters):
+    """{day: {pending, completed, overdue}} from one GROUP BY over the window"""
+    today = _midnight(datetime.utcnow().date())
+    is_open = Task.status.in_(OPEN_STATUSES)
+    day = func.date(Task.due_date)
+
+    rows = db.session.execute(
+        select(
+            day,
+            func.sum(case((and_(is_open, Task.due_date >= today), 1), else_=0)),
+            func.sum(case((Task.status == 'completed', 1), else_=0)),
+            func.sum(case((and_(is_open, Task.due_date < today), 1), else_=0))
+        )
+        .where(*filters)
+        .group_by(day)
+        .order_by(day)
+    ).all()
+
+    # date() comes back as a date on Postgres and as text on SQLite
+    return {
+        str(d): {'pending': int(pending), 'completed': int(completed), 'overdue': int(overdue)}
+        for d, pending, completed, overdue in rows
+    }
+
+@calendar_bp.route('/calendar', methods=['GET'])
+@jwt_required()
+@conditional('%Y%m%d')
+def get_calendar():
+    """Tasks (or per-day counts) due within a date range"""
+    try:
+        user_id = get_jwt_identity()
+        start, end = parse_range(request.args)
+        window = {'from': start.isoformat(), 'to': end.isoformat()}
+
+        # Range predicates on (user_id, due_date) use ix_tasks_user_due
+        filters = [
+            Task.user_id == user_id,
+            Task.due_date >= _midnight(start),
+            Task.due_date < _midnight(end + timedelta(days=1))
+        ]
+        planner_id = request.args.get('planner_id')
+        if planner_id:
+            filters.append(Task.planner_id == planner_id)
+
+        if request.args.get('counts_only', '').lower() in ('1', 'true', 'yes'):
+            return json_response({**window, 'days': day_counts(filters)})
+
+        rows = db.session.execute(
+            select(*TASK_COLUMNS).where(*filters).order_by(Task.due_date, Task.id)
+        ).all()
+        return json_response({**window, 'tasks': task_serializer.to_dicts(rows)})
+
+    except InvalidRange as e:
+        return jsonify({'error': str(e)}), 400
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
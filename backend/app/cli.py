@@ -0,0 +1,6 @@
+def register_commands(app):
+    @app.cli.command('bootstrap')
+    def bootstrap():
+        """Apply migrations and seed achievements and the admin user (idempotent)"""
+        from init_db import init_database
+        init_database(app)
@@ -0,0 +1,23 @@
+from sqlalchemy import select, update
+from models import db, User
+
+def dialect_insert(model):
+    """insert() with on_conflict_* support for the dialect in use"""
+    if db.session.get_bind().dialect.name == 'postgresql':
+        from sqlalchemy.dialects.postgresql import insert
+    else:
+        from sqlalchemy.dialects.sqlite import insert
+    return insert(model)
+
+def lock_user_row(user_id):
+    """Hold the user's row lock until the transaction ends.
+
+    SELECT ... FOR UPDATE on Postgres. SQLite has no row locks: a no-op
+    UPDATE starts the IMMEDIATE transaction, which takes the database
+    write lock instead.
+    """
+    if db.session.get_bind().dialect.name == 'postgresql':
+        db.session.execute(select(User.id).where(User.id == user_id).with_for_update())
+    else:
+        users = User.__table__
+        db.session.execute(update(users).where(users.c.id == user_id).values(id=users.c.id))
@@ -0,0 +1,95 @@
+import hashlib
+from datetime import datetime
+from functools import wraps
+from flask import g, request, make_response
+from flask_jwt_extended import get_jwt_identity
+from sqlalchemy import event, select, update
+from sqlalchemy.orm import Session
+from models import db, User, Planner, Task, Subtask, UserAchievement
+from app.user_loader import refresh_stale_user
+
+# Rows owned by a user: any write to them changes that user's data_version.
+# user_stats is derived from tasks, so building it does not count as a change.
+OWNED = (Planner, Task, UserAchievement)
+
+def _owner(session, obj):
+    if isinstance(obj, User):
+        return obj.id
+    if isinstance(obj, OWNED):
+        return obj.user_id
+    if isinstance(obj, Subtask):
+        with session.no_autoflush:
+            task = session.get(Task, obj.task_id)
+        return task.user_id if task else None
+    return None
+
+def mark_changed(user_id, session=None):
+    """Queue a data_version bump for writes the unit of work cannot see
+    (bulk INSERT/UPDATE/DELETE statements)"""
+    session = session or db.session()
+    session.info.setdefault('changed_users', set()).add(int(user_id))
+
+@event.listens_for(Session, 'after_flush')
+def _collect_changed_users(session, flush_context):
+    changed = session.info.setdefault('changed_users', set())
+    for obj in list(session.new) + list(session.dirty) + list(session.deleted):
+        owner = _owner(session, obj)
+        if owner is not None:
+            changed.add(int(owner))
+
+@event.listens_for(Session, 'before_commit')
+def _bump_data_versions(session):
+    # Flush first so changes from the final flush are collected too
+    session.flush()
+    changed = session.info.pop('changed_users', None)
+    if changed:
+        session.connection().execute(
+            update(User.__table__)
+            .where(User.__table__.c.id.in_(changed))
+            .values(data_version=User.__table__.c.data_version + 1)
+        )
+
+@event.listens_for(Session, 'after_rollback')
+def _discard_changed_users(session):
+    session.info.pop('changed_users', None)
+
+def current_etag(user_id, extra=''):
+    """Weak ETag for the current request derived from the user's data_version"""
+    version = db.session.execute(
+        select(User.data_version).where(User.id == user_id)
+    ).scalar() or 0
+    g.data_version = version
+    key = f'{request.endpoint}|{request.query_string.decode()}|{user_id}|{version}|{extra}'
+    return hashlib.sha1(key.encode('utf-8')).hexdigest()[:24]
+
+def conditional(time_bucket=None, version=None):
+    """Answer 304 Not Modified when If-None-Match matches, before the view runs.
+
+    `time_bucket` is a strftime format mixed into the ETag for payloads that
+    also change with the clock (e.g. '%Y%m%d%H' for hourly windows).
+    `version` is a callable returning a version string for shared data the
+    payload includes beyond the user's own rows (e.g. the achievement catalog).
+    """
+    def decorator(f):
+        @wraps(f)
+        def wrapper(*args, **kwargs):
+            user_id = get_jwt_identity()
+            extra = datetime.utcnow().strftime(time_bucket) if time_bucket else ''
+            if version is not None:
+                extra += f'|{version()}'
+            etag = current_etag(user_id, extra)
+
+            if request.if_none_match.contains_weak(etag):
+                response = make_response('', 304)
+            else:
+                # The payload must be at least as new as the ETag it is sent with
+                refresh_stale_user(user_id, g.data_version)
+                response = make_response(f(*args, **kwargs))
+                if response.status_code != 200:
+                    return response
+
+            response.set_etag(etag, weak=True)
+            response.headers['Cache-Control'] = 'private, no-cache'
+            return response
+        return wrapper
+    return decorator
@@ -0,0 +1,86 @@
+from datetime import datetime
+from flask import Blueprint, Response, request, jsonify, stream_with_context
+from flask_jwt_extended import jwt_required, get_current_user
+from sqlalchemy import select
+from models import db, Task, Planner, Subtask, Achievement, UserAchievement
+from app.serializers import (
+    TASK_COLUMNS, PLANNER_COLUMNS, SUBTASK_COLUMNS, UNLOCK_COLUMNS,
+    task_serializer, planner_serializer, subtask_serializer, unlock_serializer, dumps
+)
+
+export_bp = Blueprint('export', __name__)
+
+# Rows fetched per round trip; server-side cursors on Postgres
+EXPORT_BATCH_SIZE = 1000
+
+def _stream(stmt, serializer):
+    """Yield dicts from a select() without loading the whole result"""
+    result = db.session.execute(stmt.execution_options(yield_per=EXPORT_BATCH_SIZE))
+    for partition in result.partitions():
+        yield from serializer.to_dicts(partition)
+
+def export_records(user):
+    """Every record owned by a user as (type, dict) pairs, in a stable order"""
+    profile = user.to_dict()
+    profile.pop('last_activity', None)
+    yield 'user', profile
+
+    yield from (('planner', d) for d in _stream(
+        select(*PLANNER_COLUMNS).where(Planner.user_id == user.id).order_by(Planner.id),
+        planner_serializer
+    ))
+    yield from (('task', d) for d in _stream(
+        select(*TASK_COLUMNS).where(Task.user_id == user.id).order_by(Task.id),
+        task_serializer
+    ))
+    yield from (('subtask', d) for d in _stream(
+        select(*SUBTASK_COLUMNS).join(Task, Task.id == Subtask.task_id)
+        .where(Task.user_id == user.id).order_by(Subtask.id),
+        subtask_serializer
+    ))
+    yield from (('achievement', d) for d in _stream(
+        select(*UNLOCK_COLUMNS).join(Achievement, Achievement.id == UserAchievement.achievement_id)
+        .where(UserAchievement.user_id == user.id).order_by(UserAchievement.id),
+        unlock_serializer
+    ))
+
+def _ndjson(records):
+    for kind, data in records:
+        yield dumps({'type': kind, 'data': data}) + b'\n'
+
+def _json_array(records):
+    yield b'['
+    first = True
+    for kind, data in records:
+        yield (b'' if first else b',') + dumps({'type': kind, 'data': data})
+        first = False
+    yield b']'
+
+@export_bp.route('/export', methods=['GET'])
+@jwt_required()
+def export_account():
+    """Stream a full export of the current user's data"""
+    try:
+        user = get_current_user()
+
+        if not user:
+            return jsonify({'error': 'User not found'}), 404
+
+        fmt = request.args.get('format', 'ndjson')
+        if fmt not in ('ndjson', 'json'):
+            return jsonify({'error': 'format must be ndjson or json'}), 400
+
+        encode, mimetype, extension = (
+            (_ndjson, 'application/x-ndjson', 'ndjson') if fmt == 'ndjson'
+            else (_json_array, 'application/json', 'json')
+        )
+        filename = f"planner-export-{user.id}-{datetime.utcnow():%Y%m%d}.{extension}"
+
+        return Response(
+            stream_with_context(encode(export_records(user))),
+            mimetype=mimetype,
+            headers={'Content-Disposition': f'attachment; filename="{filename}"'}
+        )
+
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
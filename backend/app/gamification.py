@@ -0,0 +1,158 @@
+import hashlib
+import threading
+import time
+from bisect import bisect_right
+from datetime import datetime
+from flask import current_app
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+from models import db, Achievement, UserAchievement
+from app.dialects import dialect_insert
+from app.xp import award, counters, level_for
+
+COUNTERS = ('tasks_completed', 'streak', 'level', 'planners_created')
+
+class AchievementCatalog:
+    """Immutable view of the achievements table, thresholds sorted per type"""
+
+    def __init__(self, achievements):
+        self.by_id = {a.id: a.to_dict() for a in achievements}
+        self.ordered = [self.by_id[i] for i in sorted(self.by_id)]
+        # Content fingerprint for ETags; changes whenever the catalog does
+        self.version = hashlib.sha1(repr(self.ordered).encode('utf-8')).hexdigest()[:12]
+        self.thresholds = {}
+        for a in achievements:
+            if a.requirement_type and a.requirement_value is not None:
+                self.thresholds.setdefault(a.requirement_type, []).append((a.requirement_value, a.id))
+        for entries in self.thresholds.values():
+            entries.sort()
+
+    def crossed(self, requirement_type, before, after):
+        """Achievement ids with before < requirement_value <= after"""
+        entries = self.thresholds.get(requirement_type, [])
+        lo = bisect_right(entries, (before, float('inf')))
+        hi = bisect_right(entries, (after, float('inf')))
+        return [aid for _, aid in entries[lo:hi]]
+
+    def reached(self, requirement_type, value):
+        """Achievement ids with requirement_value <= value"""
+        entries = self.thresholds.get(requirement_type, [])
+        return [aid for _, aid in entries[:bisect_right(entries, (value, float('inf')))]]
+
+_catalog = None
+_catalog_loaded_at = 0.0
+_catalog_generation = 0
+_catalog_lock = threading.Lock()
+
+def get_catalog():
+    """Load the catalog once per process; reloaded after an achievement change
+    commits here, or after CATALOG_TTL for changes committed by other workers"""
+    global _catalog, _catalog_loaded_at
+    catalog = _catalog
+    ttl = current_app.config['CATALOG_TTL']
+    if catalog is None or time.monotonic() - _catalog_loaded_at > ttl:
+        with _catalog_lock:
+            if _catalog is None or time.monotonic() - _catalog_loaded_at > ttl:
+                generation = _catalog_generation
+                catalog = AchievementCatalog(Achievement.query.all())
+                # An invalidation during the load means these rows may be stale:
+                # serve them to this caller but do not keep them
+                if generation == _catalog_generation:
+                    _catalog = catalog
+                    _catalog_loaded_at = time.monotonic()
+            else:
+                catalog = _catalog
+    return catalog
+
+def invalidate_catalog(*args):
+    global _catalog, _catalog_generation
+    _catalog_generation += 1
+    _catalog = None
+
+@event.listens_for(Session, 'after_flush')
+def _collect_catalog_changes(session, flush_context):
+    for obj in list(session.new) + list(session.dirty) + list(session.deleted):
+        if isinstance(obj, Achievement):
+            session.info['catalog_changed'] = True
+            return
+
+# Flush-time invalidation would let a concurrent load cache the rows from
+# before the commit, so the catalog is dropped once the change is visible
+@event.listens_for(Session, 'after_commit')
+def _invalidate_committed_catalog(session):
+    if session.info.pop('catalog_changed', False):
+        invalidate_catalog()
+
+@event.listens_for(Session, 'after_rollback')
+def _discard_catalog_changes(session):
+    session.info.pop('catalog_changed', None)
+
+def unlock(user_id, achievement_ids):
+    """Unlock achievements and award their XP.
+
+    Rows that already exist (including ones a concurrent request just
+    inserted) are skipped by the unique index, so XP is never paid twice.
+    Returns the achievements unlocked and counters() after the award.
+    """
+    catalog = get_catalog()
+    inserted = set(db.session.execute(
+        dialect_insert(UserAchievement).on_conflict_do_nothing()
+        .values([{'user_id': int(user_id), 'achievement_id': aid, 'unlocked_at': datetime.utcnow()}
+                 for aid in achievement_ids])
+        .returning(UserAchievement.achievement_id)
+    ).scalars())
+    unlocked = [catalog.by_id[aid] for aid in achievement_ids if aid in inserted]
+    if not unlocked:
+        return [], None
+
+    after = award(user_id, [(a['xp_reward'] or 0, 'achievement', a['id']) for a in unlocked])
+    return unlocked, after
+
+def unlock_crossed(user_id, before, after):
+    """Unlock achievements whose threshold lies between two counters() snapshots.
+
+    Only the thresholds between the old and new values are checked, and
+    level ups caused by achievement XP are followed until nothing new unlocks.
+    """
+    catalog = get_catalog()
+    newly_unlocked = []
+    while True:
+        candidates = [aid for c in COUNTERS for aid in catalog.crossed(c, before[c], after[c])]
+        if not candidates:
+            return newly_unlocked
+        unlocked, next_after = unlock(user_id, candidates)
+        if not unlocked:
+            return newly_unlocked
+        newly_unlocked += unlocked
+        before, after = after, next_after
+
+def award_progress(user_id, events=(), tasks_completed=0, planners_created=0):
+    """Apply an award and unlock every achievement it crosses"""
+    events = list(events)
+    after = award(user_id, events, tasks_completed, planners_created)
+    before = dict(
+        after,
+        tasks_completed=after['tasks_completed'] - tasks_completed,
+        planners_created=after['planners_created'] - planners_created,
+        # The UPDATE only returns the new streak; a repeat check is a no-op insert
+        streak=after['streak'] - 1 if tasks_completed else after['streak'],
+        level=min(after['level'], level_for(after['total_xp'] - sum(e[0] for e in events)))
+    )
+    return unlock_crossed(user_id, before, after)
+
+def unlock_reached(user_id, unlocked_ids):
+    """Unlock every achievement the user qualifies for (full reconcile)"""
+    catalog = get_catalog()
+    skip = set(unlocked_ids)
+    current = counters(user_id)
+    newly_unlocked = []
+    while True:
+        candidates = [aid for c in COUNTERS for aid in catalog.reached(c, current[c]) if aid not in skip]
+        if not candidates:
+            return newly_unlocked
+        skip.update(candidates)
+        unlocked, after = unlock(user_id, candidates)
+        if not unlocked:
+            return newly_unlocked
+        newly_unlocked += unlocked
+        current = after
@@ -0,0 +1,350 @@
+import csv
+import io
+import json
+from datetime import datetime
+from flask import Blueprint, request, jsonify
+from flask_jwt_extended import jwt_required, get_jwt_identity
+from sqlalchemy import insert, select
+from models import db, Planner, Task, Subtask
+from app.tasks import INT_MAX, TASK_PRIORITIES, TASK_STATUSES, calculate_xp
+from app.stats import invalidate_stats
+from app.etag import mark_changed
+from app.tags import set_task_tags
+
+import_bp = Blueprint('import', __name__)
+
+IMPORT_CHUNK_SIZE = 1000
+MAX_REPORTED_ERRORS = 1000
+
+# /api/export lines that describe things an import does not create
+SKIPPED_TYPES = ('user', 'achievement')
+
+class ImportRowError(ValueError):
+    """A single row failed validation"""
+
+def read_csv(stream):
+    """Yield (line_number, record, error) from a CSV text stream"""
+    for line_no, row in enumerate(csv.DictReader(stream), start=2):
+        yield line_no, {k.strip().lower(): v for k, v in row.items() if k and v not in (None, '')}, None
+
+def read_ndjson(stream):
+    """Yield (line_number, record, error) from an NDJSON text stream"""
+    for line_no, line in enumerate(stream, start=1):
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            record = json.loads(line)
+        except ValueError:
+            yield line_no, None, 'Invalid JSON'
+            continue
+        if not isinstance(record, dict):
+            yield line_no, None, 'Each line must be a JSON object'
+            continue
+        yield line_no, record, None
+
+READERS = {'csv': read_csv, 'ndjson': read_ndjson}
+
+def _datetime(value, field):
+    if value in (None, ''):
+        return None
+    try:
+        return datetime.fromisoformat(str(value))
+    except ValueError:
+        raise ImportRowError(f'Invalid {field}: {value}')
+
+def _int(value, field):
+    if value in (None, ''):
+        return None
+    if isinstance(value, bool):
+        raise ImportRowError(f'Invalid {field}: {value}')
+    try:
+        number = int(value)
+    except (TypeError, ValueError, OverflowError):
+        raise ImportRowError(f'Invalid {field}: {value}')
+    if abs(number) > INT_MAX:
+        raise ImportRowError(f'{field} is out of range: {value}')
+    return number
+
+def _text(value, field, max_length, required=False):
+    """Trimmed string no longer than the column allows"""
+    if isinstance(value, (dict, list)):
+        raise ImportRowError(f'{field} must be a string')
+    value = '' if value is None else str(value).strip()
+    if not value:
+        if required:
+            raise ImportRowError(f'{field} is required')
+        return None
+    if len(value) > max_length:
+        raise ImportRowError(f'{field} is longer than {max_length} characters')
+    return value
+
+def _description(value, field):
+    """Free text (unbounded column) that must still bind as a string"""
+    if value is not None and not isinstance(value, str):
+        raise ImportRowError(f'{field} must be a string')
+    return value
+
+def _bool(value):
+    if isinstance(value, str):
+        return value.strip().lower() in ('1', 'true', 'yes')
+    return bool(value)
+
+def _choice(value, allowed, default, field):
+    value = str(value or default).strip().lower()
+    if value not in allowed:
+        raise ImportRowError(f"Invalid {field}: {value} (expected one of {', '.join(allowed)})")
+    return value
+
+class Importer:
+    """Validates records and writes them in multi-row INSERT batches.
+
+    Records are tasks unless `type` is "planner" or "subtask"; records
+    shaped like /api/export lines ({"type": ..., "data": {...}}) are
+    accepted too, and their user and achievement lines are skipped.
+    Tasks reference planners by name (`planner`); unknown names create a
+    planner. Exported ids are remapped: tasks by `planner_id`, subtasks by
+    `task_id`. Every field is validated before anything is buffered.
+    Nothing here awards XP: imported history is not gameplay.
+    """
+
+    def __init__(self, user_id, chunk_size=IMPORT_CHUNK_SIZE):
+        self.user_id = int(user_id)
+        self.chunk_size = chunk_size
+        self.tasks = []
+        self.subtasks = []
+        self.new_planners = {}
+        self.source_planners = {}
+        self.source_tasks = set()
+        self.task_ids = {}
+        self.errors = []
+        self.error_count = 0
+        self.skipped = 0
+        self.tasks_created = 0
+        self.subtasks_created = 0
+        self.planners_created = 0
+
+        # One lookup maps every existing planner name to its id
+        self.planner_ids = {
+            name.lower(): pid for pid, name in db.session.execute(
+                select(Planner.id, Planner.name).where(Planner.user_id == self.user_id)
+            )
+        }
+
+    def add(self, line_no, record, error=None):
+        try:
+            if error:
+                raise ImportRowError(error)
+            kind = record.get('type', 'task')
+            data = record.get('data', record)
+            if kind in SKIPPED_TYPES:
+                self.skipped += 1
+            elif not isinstance(data, dict):
+                raise ImportRowError('data must be an object')
+            elif kind == 'planner':
+                self._add_planner(data)
+            elif kind == 'task':
+                self._add_task(data)
+            elif kind == 'subtask':
+                self._add_subtask(data)
+            else:
+                raise ImportRowError(f'Unsupported record type: {kind}')
+        except ImportRowError as e:
+            self.error_count += 1
+            if len(self.errors) < MAX_REPORTED_ERRORS:
+                self.errors.append({'line': line_no, 'error': str(e)})
+
+        if len(self.tasks) + len(self.subtasks) >= self.chunk_size:
+            self.flush()
+
+    def _planner_key(self, name):
+        """Key of a planner name (already validated), buffering a new planner if unknown"""
+        key = name.lower()
+        if key not in self.planner_ids and key not in self.new_planners:
+            self.new_planners[key] = {
+                'user_id': self.user_id,
+                'name': name,
+                'type': 'todo',
+                'color': '#6B46C1',
+                'icon': '📋',
+                'description': None,
+                'target_frequency': None,
+                'target_value': None
+            }
+        return key
+
+    def _add_planner(self, data):
+        name = _text(data.get('name'), 'Planner name', 255, required=True)
+        values = {
+            'type': _text(data.get('type'), 'Planner type', 50) or 'todo',
+            'color': _text(data.get('color'), 'Planner color', 20) or '#6B46C1',
+            'icon': _text(data.get('icon'), 'Planner icon', 50) or '📋',
+            'description': _description(data.get('description'), 'Planner description'),
+            'target_frequency': _int(data.get('target_frequency'), 'target_frequency'),
+            'target_value': _int(data.get('target_value'), 'target_value')
+        }
+
+        key = self._planner_key(name)
+        if key in self.new_planners:
+            self.new_planners[key].update(values)
+
+        # Planner ids from an export are remapped by name
+        if data.get('id') is not None:
+            self.source_planners[str(data['id'])] = key
+
+    def _add_task(self, data):
+        title = _text(data.get('title'), 'Task title', 500, required=True)
+        priority = _choice(data.get('priority'), TASK_PRIORITIES, 'medium', 'priority')
+        status = _choice(data.get('status'), TASK_STATUSES, 'pending', 'status')
+        completed_at = _datetime(data.get('completed_at'), 'completed_at')
+        if status == 'completed' and completed_at is None:
+            completed_at = datetime.utcnow()
+
+        tags = data.get('tags')
+        if isinstance(tags, list):
+            tags = ','.join(str(t) for t in tags)
+        tags = _text(tags, 'tags', 500)
+
+        row = {
+            'user_id': self.user_id,
+            'title': title,
+            'description': _description(data.get('description'), 'Task description'),
+            'status': status,
+            'priority': priority,
+            'due_date': _datetime(data.get('due_date') or data.get('date'), 'due_date'),
+            'completed_at': completed_at,
+            'tags': tags,
+            'estimated_time': _int(data.get('estimated_time', data.get('duration')), 'estimated_time'),
+            'actual_time': _int(data.get('actual_time'), 'actual_time'),
+            'xp_reward': calculate_xp(priority)
+        }
+        planner_name = _text(data.get('planner'), 'Planner name', 255)
+
+        # The row is valid; only now may it create a planner
+        if planner_name:
+            row['planner_key'] = self._planner_key(planner_name)
+        elif data.get('planner_id') is not None:
+            row['planner_key'] = self.source_planners.get(str(data['planner_id']))
+        else:
+            row['planner_key'] = None
+
+        # Task ids from an export are remapped for their subtasks
+        row['source_key'] = str(data['id']) if data.get('id') is not None else None
+        if row['source_key'] is not None:
+            self.source_tasks.add(row['source_key'])
+        self.tasks.append(row)
+
+    def _add_subtask(self, data):
+        title = _text(data.get('title'), 'Subtask title', 500, required=True)
+        order = _int(data.get('order'), 'order') or 0
+        task_key = str(data.get('task_id'))
+        if task_key not in self.source_tasks:
+            raise ImportRowError(f"Unknown task_id: {data.get('task_id')}")
+
+        self.subtasks.append({
+            'task_key': task_key,
+            'title': title,
+            'completed': _bool(data.get('completed')),
+            'order': order
+        })
+
+    def flush(self):
+        """Write buffered planners then tasks, one multi-row INSERT each"""
+        if self.new_planners:
+            rows = db.session.execute(
+                insert(Planner).returning(Planner.id, Planner.name, sort_by_parameter_order=True),
+                list(self.new_planners.values())
+            ).all()
+            for key, (pid, _) in zip(self.new_planners, rows):
+                self.planner_ids[key] = pid
+            self.planners_created += len(rows)
+            self.new_planners = {}
+
+        if self.tasks:
+            source_keys = [row.pop('source_key') for row in self.tasks]
+            for row in self.tasks:
+                key = row.pop('planner_key')
+                row['planner_id'] = self.planner_ids.get(key) if key else None
+            ids = db.session.execute(
+                insert(Task).returning(Task.id, sort_by_parameter_order=True),
+                self.tasks
+            ).scalars().all()
+            set_task_tags(self.user_id, {
+                task_id: row['tags'] for task_id, row in zip(ids, self.tasks) if row['tags']
+            }, replace=False)
+            self.task_ids.update((key, task_id) for key, task_id in zip(source_keys, ids) if key is not None)
+            self.tasks_created += len(self.tasks)
+            self.tasks = []
+
+        if self.subtasks:
+            for row in self.subtasks:
+                row['task_id'] = self.task_ids[row.pop('task_key')]
+            db.session.execute(insert(Subtask), self.subtasks)
+            self.subtasks_created += len(self.subtasks)
+            self.subtasks = []
+
+        mark_changed(self.user_id)
+        db.session.commit()
+
+    def finish(self):
+        self.flush()
+        if self.tasks_created or self.planners_created:
+            invalidate_stats(self.user_id)
+            db.session.commit()
+        return self.report()
+
+    def report(self):
+        return {
+            'tasks_created': self.tasks_created,
+            'subtasks_created': self.subtasks_created,
+            'planners_created': self.planners_created,
+            'records_skipped': self.skipped,
+            'error_count': self.error_count,
+            'errors': self.errors
+        }
+
+def import_stream(user_id, stream, fmt):
+    """Import a text stream (csv or ndjson) and return the report"""
+    importer = Importer(user_id)
+    try:
+        for line_no, record, error in READERS[fmt](stream):
+            importer.add(line_no, record, error)
+        return importer.finish()
+    except Exception:
+        db.session.rollback()
+        raise
+
+def detect_format(filename, content_type):
+    name = (filename or '').lower()
+    content_type = (content_type or '').lower()
+    if name.endswith('.csv') or 'csv' in content_type:
+        return 'csv'
+    if name.endswith(('.ndjson', '.jsonl')) or 'ndjson' in content_type or 'jsonl' in content_type:
+        return 'ndjson'
+    return None
+
+@import_bp.route('/import', methods=['POST'])
+@jwt_required()
+def import_data():
+    """Import tasks, subtasks and planners from a CSV or NDJSON upload"""
+    try:
+        user_id = get_jwt_identity()
+
+        upload = request.files.get('file')
+        if upload:
+            raw = upload.stream
+            fmt = request.args.get('format') or detect_format(upload.filename, upload.mimetype)
+        else:
+            raw = request.stream
+            fmt = request.args.get('format') or detect_format(None, request.content_type)
+
+        if fmt not in READERS:
+            return jsonify({'error': 'format must be csv or ndjson'}), 400
+
+        stream = io.TextIOWrapper(raw, encoding='utf-8-sig', newline='')
+        return jsonify(import_stream(user_id, stream, fmt)), 200
+
+    except UnicodeDecodeError:
+        return jsonify({'error': 'Upload must be UTF-8 encoded'}), 400
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
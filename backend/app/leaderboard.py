@@ -0,0 +1,165 @@
+import threading
+import time
+from datetime import datetime, timedelta
+from flask import current_app, request
+from sqlalchemy import and_, case, func, or_, select
+from models import db, User, Task
+
+WINDOWS = {
+    'all': None,
+    'weekly': timedelta(days=7),
+    'monthly': timedelta(days=30),
+}
+
+# Top of the all-time board kept in memory between refreshes
+SNAPSHOT_SIZE = 100
+MAX_PAGE_SIZE = 100
+NEARBY = 2
+
+def _current_streak():
+    """SQL form of User.current_streak: 0 once a full day passed without a completion"""
+    yesterday = datetime.utcnow().date() - timedelta(days=1)
+    return case(
+        (User.last_active_on >= yesterday, func.coalesce(User.streak, 0)), else_=0
+    ).label('current_streak')
+
+def _entry_columns():
+    return (
+        User.id, User.username, User.avatar, User.level, User.xp, User.total_xp,
+        _current_streak(), User.longest_streak, User.tasks_completed, User.planners_created,
+        User.created_at
+    )
+
+_snapshots = {}
+_lock = threading.Lock()
+
+def _entry(row, rank, window_xp=None):
+    entry = {
+        'rank': rank,
+        'id': str(row.id),
+        'name': row.username,
+        'avatar_url': row.avatar,
+        'level': row.level,
+        'xp': row.xp,
+        'total_xp': row.total_xp,
+        'streak': row.current_streak,
+        'longest_streak': row.longest_streak or 0,
+        'tasks_completed': row.tasks_completed,
+        'planners_created': row.planners_created or 0,
+        'created_at': row.created_at.isoformat() if row.created_at else None
+    }
+    if window_xp is not None:
+        entry['window_xp'] = window_xp
+    return entry
+
+def _ranked(rows, start=1, window=False):
+    return [_entry(r, start + i, r.window_xp if window else None) for i, r in enumerate(rows)]
+
+def _all_time_board():
+    """(select of entry columns, score column) for the all-time board"""
+    # Ordering by total_xp, id matches ix_users_total_xp scanned backwards
+    return select(*_entry_columns()), User.total_xp
+
+def _window_board(span):
+    """(select of entry columns plus window_xp, score column) for a window,
+    limited to users who completed tasks inside it"""
+    since = datetime.utcnow() - span
+    earned = select(
+        Task.user_id,
+        func.sum(Task.xp_reward).label('window_xp')
+    ).where(
+        Task.status == 'completed',
+        Task.completed_at >= since
+    ).group_by(Task.user_id).subquery()
+
+    board = select(*_entry_columns(), earned.c.window_xp).join(earned, earned.c.user_id == User.id)
+    return board, earned.c.window_xp
+
+def _board(window):
+    span = WINDOWS[window]
+    return _all_time_board() if span is None else _window_board(span)
+
+def _load_page(window, offset, limit):
+    board, score = _board(window)
+    rows = db.session.execute(
+        board.order_by(score.desc(), User.id.desc()).offset(offset).limit(limit)
+    ).all()
+    return _ranked(rows, start=offset + 1, window=WINDOWS[window] is not None)
+
+def snapshot(window):
+    """Cached top SNAPSHOT_SIZE of a window, refreshed at most once per TTL per process"""
+    ttl = current_app.config.get('LEADERBOARD_TTL', 30)
+    now = time.monotonic()
+
+    with _lock:
+        cached = _snapshots.get(window)
+        if cached and cached[0] > now:
+            return cached[1]
+
+    entries = _load_page(window, 0, SNAPSHOT_SIZE)
+
+    with _lock:
+        _snapshots[window] = (now + ttl, entries)
+    return entries
+
+def invalidate():
+    with _lock:
+        _snapshots.clear()
+
+def _page(window, offset, limit):
+    if offset + limit <= SNAPSHOT_SIZE:
+        return snapshot(window)[offset:offset + limit]
+    return _load_page(window, offset, limit)
+
+def _position(window, user_id):
+    """Caller's rank (a COUNT of users ahead) and neighbours, without loading the board"""
+    board, score = _board(window)
+    is_window = WINDOWS[window] is not None
+
+    me = db.session.execute(board.where(User.id == user_id)).first()
+    if not me:
+        return None, []
+
+    my_score = me.window_xp if is_window else me.total_xp
+    ahead = or_(score > my_score, and_(score == my_score, User.id > me.id))
+    behind = or_(score < my_score, and_(score == my_score, User.id < me.id))
+
+    rank = db.session.execute(
+        select(func.count()).select_from(board.where(ahead).subquery())
+    ).scalar() + 1
+
+    above = db.session.execute(
+        board.where(ahead).order_by(score.asc(), User.id.asc()).limit(NEARBY)
+    ).all()
+    below = db.session.execute(
+        board.where(behind).order_by(score.desc(), User.id.desc()).limit(NEARBY)
+    ).all()
+
+    me_entry = _entry(me, rank, me.window_xp if is_window else None)
+    nearby = (
+        _ranked(list(reversed(above)), start=rank - len(above), window=is_window)
+        + [me_entry]
+        + _ranked(below, start=rank + 1, window=is_window)
+    )
+    return me_entry, nearby
+
+def leaderboard(user_id):
+    """Build the leaderboard payload from request args (window, limit, offset)"""
+    window = request.args.get('window', 'all')
+    if window not in WINDOWS:
+        raise ValueError(f"window must be one of: {', '.join(WINDOWS)}")
+
+    limit = max(1, min(request.args.get('limit', 10, type=int), MAX_PAGE_SIZE))
+    offset = max(0, request.args.get('offset', 0, type=int))
+
+    entries = _page(window, offset, limit)
+    me, nearby = _position(window, user_id)
+
+    return {
+        'leaderboard': entries,
+        'window': window,
+        'offset': offset,
+        'limit': limit,
+        'me': me,
+        'nearby': nearby
+    }
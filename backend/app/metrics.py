@@ -0,0 +1,282 @@
+import hmac
+import os
+import threading
+import time
+from collections import defaultdict, deque
+from flask import Blueprint, Response, current_app, g, has_app_context, request, jsonify
+from sqlalchemy import event, exc
+from sqlalchemy.pool import QueuePool
+from models import db
+
+metrics_bp = Blueprint('metrics', __name__)
+
+RECENT_WAITS = 1000
+SLOW_LOG_STATEMENTS = 50
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+SIZE_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304)
+STATEMENT_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100)
+
+class PoolStats:
+    """Per-process connection pool counters, fed by TimedQueuePool and pool events"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self.checkouts = 0
+            self.timeouts = 0
+            self.connects = 0
+            self.invalidations = 0
+            self.wait_total = 0.0
+            self.wait_max = 0.0
+            self.recent = deque(maxlen=RECENT_WAITS)
+
+    def observe_wait(self, seconds, timed_out=False):
+        with self._lock:
+            if timed_out:
+                self.timeouts += 1
+            else:
+                self.checkouts += 1
+            self.wait_total += seconds
+            self.wait_max = max(self.wait_max, seconds)
+            self.recent.append(seconds)
+
+    def count(self, name):
+        with self._lock:
+            setattr(self, name, getattr(self, name) + 1)
+
+    def snapshot(self):
+        with self._lock:
+            recent = sorted(self.recent)
+            requests = self.checkouts + self.timeouts
+
+            def pct(p):
+                return round(recent[min(len(recent) - 1, int(len(recent) * p))] * 1000, 3) if recent else 0.0
+
+            return {
+                'checkouts': self.checkouts,
+                'timeouts': self.timeouts,
+                'connects': self.connects,
+                'invalidations': self.invalidations,
+                'wait_ms': {
+                    'avg': round(self.wait_total / requests * 1000, 3) if requests else 0.0,
+                    'max': round(self.wait_max * 1000, 3),
+                    'p50': pct(0.5),
+                    'p95': pct(0.95),
+                    'p99': pct(0.99),
+                    'window': len(recent),
+                },
+            }
+
+pool_stats = PoolStats()
+
+class TimedQueuePool(QueuePool):
+    """QueuePool that records how long each checkout waited (including connecting)"""
+
+    # Log as sqlalchemy.pool, not under the Flask app's logger
+    _sqla_logger_namespace = 'sqlalchemy.pool.impl.QueuePool'
+
+    def connect(self):
+        start = time.perf_counter()
+        try:
+            conn = super().connect()
+        except exc.TimeoutError:
+            pool_stats.observe_wait(time.perf_counter() - start, timed_out=True)
+            raise
+        pool_stats.observe_wait(time.perf_counter() - start)
+        return conn
+
+def instrument_pool(engine):
+    """Count new and invalidated DBAPI connections on the engine's pool"""
+    event.listen(engine.pool, 'connect', lambda *args: pool_stats.count('connects'))
+    event.listen(engine.pool, 'invalidate', lambda *args: pool_stats.count('invalidations'))
+
+def pool_status(engine):
+    """Live pool gauges plus the accumulated checkout stats"""
+    pool = engine.pool
+    status = {'pool': type(pool).__name__, 'pid': os.getpid()}
+    if isinstance(pool, QueuePool):
+        status.update({
+            'size': pool.size(),
+            'max_overflow': pool._max_overflow,
+            'timeout': pool.timeout(),
+            'checked_out': pool.checkedout(),
+            'checked_in': pool.checkedin(),
+            'overflow': max(pool.overflow(), 0),
+        })
+    status.update(pool_stats.snapshot())
+    return status
+
+def metrics_allowed():
+    """Metrics expose endpoints, SQL timings and pool state: outside development
+    and testing they need METRICS_TOKEN, and stay closed while it is unset"""
+    token = current_app.config.get('METRICS_TOKEN')
+    if not token:
+        return current_app.debug or current_app.testing
+    return hmac.compare_digest(request.headers.get('X-Metrics-Token', ''), token)
+
+@metrics_bp.route('/metrics/pool', methods=['GET'])
+def get_pool_metrics():
+    """Connection pool usage for the worker that serves the request"""
+    try:
+        if not metrics_allowed():
+            return jsonify({'error': 'Missing or invalid metrics token'}), 401
+        return jsonify(pool_status(db.engine))
+
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+class Histogram:
+    """Prometheus-style cumulative histogram keyed by a tuple of label values"""
+
+    def __init__(self, name, help, labels, buckets):
+        self.name = name
+        self.help = help
+        self.labels = labels
+        self.buckets = buckets
+        self._lock = threading.Lock()
+        self._series = {}
+
+    def observe(self, values, amount):
+        with self._lock:
+            series = self._series.get(values)
+            if series is None:
+                series = self._series[values] = [[0] * len(self.buckets), 0.0, 0]
+            for i, bound in enumerate(self.buckets):
+                if amount <= bound:
+                    series[0][i] += 1
+            series[1] += amount
+            series[2] += 1
+
+    def render(self):
+        lines = [f'# HELP {self.name} {self.help}', f'# TYPE {self.name} histogram']
+        with self._lock:
+            for values, (counts, total, count) in sorted(self._series.items()):
+                labels = ','.join(f'{k}="{v}"' for k, v in zip(self.labels, values))
+                for bound, n in zip(self.buckets, counts):
+                    lines.append(f'{self.name}_bucket{{{labels},le="{bound}"}} {n}')
+                lines.append(f'{self.name}_bucket{{{labels},le="+Inf"}} {count}')
+                lines.append(f'{self.name}_sum{{{labels}}} {total}')
+                lines.append(f'{self.name}_count{{{labels}}} {count}')
+        return lines
+
+class RequestMetrics:
+    """Per-endpoint request latency, response size and SQL usage for this process"""
+
+    LABELS = ('blueprint', 'endpoint', 'method')
+
+    def __init__(self):
+        self.latency = Histogram(
+            'http_request_duration_seconds', 'Request latency', self.LABELS, LATENCY_BUCKETS)
+        self.size = Histogram(
+            'http_response_size_bytes', 'Response body size', self.LABELS, SIZE_BUCKETS)
+        self.statements = Histogram(
+            'http_request_sql_statements', 'SQL statements per request', self.LABELS, STATEMENT_BUCKETS)
+        self.sql_time = Histogram(
+            'http_request_sql_duration_seconds', 'SQL time per request', self.LABELS, LATENCY_BUCKETS)
+        self._lock = threading.Lock()
+        self._responses = defaultdict(int)
+
+    def observe(self, labels, status, seconds, size, statements, sql_seconds):
+        self.latency.observe(labels, seconds)
+        if size is not None:
+            self.size.observe(labels, size)
+        self.statements.observe(labels, statements)
+        self.sql_time.observe(labels, sql_seconds)
+        with self._lock:
+            self._responses[labels + (str(status),)] += 1
+
+    def render(self):
+        lines = ['# HELP http_requests_total Requests by endpoint and status', '# TYPE http_requests_total counter']
+        with self._lock:
+            for values, n in sorted(self._responses.items()):
+                labels = ','.join(f'{k}="{v}"' for k, v in zip(self.LABELS + ('status',), values))
+                lines.append(f'http_requests_total{{{labels}}} {n}')
+        for histogram in (self.latency, self.size, self.statements, self.sql_time):
+            lines.extend(histogram.render())
+        return lines
+
+request_metrics = RequestMetrics()
+
+def render_pool(engine):
+    status = pool_status(engine)
+    gauges = (
+        ('db_pool_size', 'Configured pool size', status.get('size')),
+        ('db_pool_checked_out', 'Connections in use', status.get('checked_out')),
+        ('db_pool_overflow', 'Connections open beyond the pool size', status.get('overflow')),
+    )
+    counters = (
+        ('db_pool_checkouts_total', 'Connection checkouts', status['checkouts']),
+        ('db_pool_timeouts_total', 'Checkouts that timed out waiting for a connection', status['timeouts']),
+        ('db_pool_connects_total', 'New database connections', status['connects']),
+        ('db_pool_invalidations_total', 'Connections invalidated', status['invalidations']),
+    )
+    lines = []
+    for name, help, value in gauges:
+        if value is not None:
+            lines += [f'# HELP {name} {help}', f'# TYPE {name} gauge', f'{name} {value}']
+    for name, help, value in counters:
+        lines += [f'# HELP {name} {help}', f'# TYPE {name} counter', f'{name} {value}']
+    lines += [
+        '# HELP db_pool_checkout_wait_seconds Time spent waiting for a connection',
+        '# TYPE db_pool_checkout_wait_seconds summary',
+        f"db_pool_checkout_wait_seconds_sum {pool_stats.wait_total}",
+        f"db_pool_checkout_wait_seconds_count {status['checkouts'] + status['timeouts']}",
+    ]
+    return lines
+
+def instrument_requests(app, engine):
+    """Time every request and the SQL it runs; log slow ones when SLOW_REQUEST_MS is set"""
+    slow_ms = app.config.get('SLOW_REQUEST_MS')
+
+    @event.listens_for(engine, 'before_cursor_execute')
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        conn.info['query_start'] = time.perf_counter()
+
+    @event.listens_for(engine, 'after_cursor_execute')
+    def after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        elapsed = time.perf_counter() - conn.info['query_start']
+        stats = g.get('request_stats') if has_app_context() else None
+        if stats is None:
+            return
+        stats['statements'] += 1
+        stats['sql_seconds'] += elapsed
+        if slow_ms is not None and len(stats['log']) < SLOW_LOG_STATEMENTS:
+            stats['log'].append((elapsed, ' '.join(statement.split())))
+
+    @app.before_request
+    def start_request():
+        g.request_stats = {'start': time.perf_counter(), 'statements': 0, 'sql_seconds': 0.0, 'log': []}
+
+    @app.after_request
+    def record_request(response):
+        stats = g.pop('request_stats', None)
+        if stats is None:
+            return response
+
+        elapsed = time.perf_counter() - stats['start']
+        labels = (request.blueprint or '', request.endpoint or 'unmatched', request.method)
+        size = None if response.is_streamed else response.calculate_content_length()
+        request_metrics.observe(
+            labels, response.status_code, elapsed, size, stats['statements'], stats['sql_seconds']
+        )
+
+        if slow_ms is not None and elapsed * 1000 >= slow_ms:
+            app.logger.warning(
+                'Slow request: %s %s -> %s in %.0f ms, %d SQL statements in %.0f ms\n%s',
+                request.method, request.full_path.rstrip('?'), response.status_code, elapsed * 1000,
+                stats['statements'], stats['sql_seconds'] * 1000,
+                '\n'.join(f'  {t * 1000:8.1f} ms  {sql}' for t, sql in stats['log'])
+            )
+        return response
+
+    @app.route('/metrics')
+    def prometheus_metrics():
+        """Prometheus text exposition of this worker's request and pool metrics"""
+        if not metrics_allowed():
+            return jsonify({'error': 'Missing or invalid metrics token'}), 401
+        lines = request_metrics.render() + render_pool(db.engine)
+        return Response('\n'.join(lines) + '\n', mimetype='text/plain; version=0.0.4')
@@ -0,0 +1,60 @@
+import base64
+import json
+from datetime import datetime
+from flask import request
+from sqlalchemy import and_, or_
+from models import db
+
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 200
+
+class InvalidCursor(ValueError):
+    """Raised when a client sends a malformed pagination cursor"""
+
+def encode_cursor(created_at, row_id):
+    """Build an opaque cursor from the (created_at, id) of the last row"""
+    payload = json.dumps([created_at.isoformat() if created_at else None, row_id])
+    return base64.urlsafe_b64encode(payload.encode('utf-8')).decode('ascii').rstrip('=')
+
+def decode_cursor(cursor):
+    """Parse a cursor produced by encode_cursor"""
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        created_at, row_id = json.loads(base64.urlsafe_b64decode(padded.encode('ascii')))
+        return (datetime.fromisoformat(created_at) if created_at else None), int(row_id)
+    except (ValueError, TypeError, UnicodeError):
+        raise InvalidCursor('Invalid cursor')
+
+def wants_page():
+    """True when the client asked for a paginated response"""
+    return 'limit' in request.args or 'cursor' in request.args
+
+def page_size():
+    """Read and clamp the `limit` query parameter"""
+    limit = request.args.get('limit', type=int) or DEFAULT_PAGE_SIZE
+    return max(1, min(limit, MAX_PAGE_SIZE))
+
+def paginate(stmt, model, limit, cursor=None):
+    """Keyset pagination over (created_at DESC, id DESC).
+
+    `stmt` is a select() whose rows expose created_at and id. Returns
+    (rows, next_cursor). Fetches limit + 1 rows so the next cursor is only
+    issued when another page actually exists.
+    """
+    if cursor:
+        created_at, row_id = decode_cursor(cursor)
+        stmt = stmt.where(or_(
+            model.created_at < created_at,
+            and_(model.created_at == created_at, model.id < row_id)
+        ))
+
+    rows = db.session.execute(
+        stmt.order_by(model.created_at.desc(), model.id.desc()).limit(limit + 1)
+    ).all()
+
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = encode_cursor(rows[-1].created_at, rows[-1].id)
+
+    return rows, next_cursor
@@ -0,0 +1,72 @@
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeout
+from flask import current_app
+import bcrypt
+
+class PasswordHasherBusy(RuntimeError):
+    """Raised when the bcrypt pool is saturated; callers answer 503"""
+
+_executor = None
+_executor_pid = None
+_slots = None
+_lock = threading.Lock()
+
+def _executor_class():
+    """Native threads even under gevent, where patched threads would run
+    bcrypt on the event loop and stall every other request"""
+    try:
+        from gevent import monkey
+        if monkey.is_module_patched('threading'):
+            from gevent.threadpool import ThreadPoolExecutor as GeventThreadPoolExecutor
+            return GeventThreadPoolExecutor
+    except ImportError:
+        pass
+    return ThreadPoolExecutor
+
+def _pool():
+    """Per-process pool, created lazily so it survives gunicorn's fork"""
+    global _executor, _executor_pid, _slots
+    if _executor is None or _executor_pid != os.getpid():
+        with _lock:
+            if _executor is None or _executor_pid != os.getpid():
+                workers = current_app.config['BCRYPT_WORKERS']
+                _executor = _executor_class()(max_workers=workers, thread_name_prefix='bcrypt')
+                _slots = threading.BoundedSemaphore(workers + current_app.config['BCRYPT_QUEUE_DEPTH'])
+                _executor_pid = os.getpid()
+    return _executor, _slots
+
+def _run(fn, *args):
+    """Run bcrypt work on the pool, shedding load instead of queueing forever"""
+    executor, slots = _pool()
+    if not slots.acquire(blocking=False):
+        raise PasswordHasherBusy('Too many concurrent password operations')
+
+    try:
+        future = executor.submit(fn, *args)
+    except Exception:
+        slots.release()
+        raise
+    future.add_done_callback(lambda _: slots.release())
+
+    try:
+        return future.result(timeout=current_app.config['BCRYPT_TIMEOUT'])
+    except FutureTimeout:
+        raise PasswordHasherBusy('Password operation timed out')
+
+def hash_password(password):
+    rounds = current_app.config['BCRYPT_ROUNDS']
+    return _run(lambda: bcrypt.hashpw(password.encode('utf-8'), bcrypt.gensalt(rounds=rounds)).decode('utf-8'))
+
+def check_password(password, password_hash):
+    return _run(lambda: bcrypt.checkpw(password.encode('utf-8'), password_hash.encode('utf-8')))
+
+def hash_rounds(password_hash):
+    """Work factor stored in a $2b$<rounds>$... hash, or None if unparseable"""
+    try:
+        return int(password_hash.split('$')[2])
+    except (AttributeError, IndexError, ValueError):
+        return None
+
+def needs_rehash(password_hash):
+    return hash_rounds(password_hash) != current_app.config['BCRYPT_ROUNDS']
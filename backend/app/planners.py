@@ -1,25 +1,42 @@
 from flask import Blueprint, request, jsonify
 from flask_jwt_extended import jwt_required, get_jwt_identity
-from models import db, User, Planner, Task
-from datetime import datetime
+from models import db, Planner, Task, Subtask
+from app.pagination import InvalidCursor, wants_page, page_size, paginate
+from app.stats import record_planner_change, invalidate_stats
+from app.gamification import award_progress
+from app.etag import conditional, mark_changed
+from app.sync import record_planner_deletion
+from app.tags import delete_task_tags
+from app.serializers import PLANNER_COLUMNS, planner_serializer, json_response
+from sqlalchemy import delete, select
 
 planners_bp = Blueprint('planners', __name__)
 
 @planners_bp.route('/planners', methods=['GET'])
 @jwt_required()
+@conditional()
 def get_planners():
     """Get all planners for current user"""
     try:
         user_id = get_jwt_identity()
         planner_type = request.args.get('type')  # Filter by type
 
-        query = Planner.query.filter_by(user_id=user_id)
+        stmt = select(*PLANNER_COLUMNS).where(Planner.user_id == user_id)
         if planner_type:
-            query = query.filter_by(type=planner_type)
+            stmt = stmt.where(Planner.type == planner_type)
 
-        planners = query.order_by(Planner.created_at.desc()).all()
-        return jsonify([p.to_dict() for p in planners]), 200
+        if wants_page():
+            rows, next_cursor = paginate(stmt, Planner, page_size(), request.args.get('cursor'))
+            return json_response({
+                'planners': planner_serializer.to_dicts(rows),
+                'next_cursor': next_cursor
+            })
 
+        rows = db.session.execute(stmt.order_by(Planner.created_at.desc())).all()
+        return json_response(planner_serializer.to_dicts(rows))
+
+    except InvalidCursor as e:
+        return jsonify({'error': str(e)}), 400
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
@@ -42,15 +59,16 @@ def create_planner():
             target_value=data.get('target_value')
         )
         db.session.add(planner)
-        db.session.commit()
+        record_planner_change(user_id, 1)
 
-        # Update user stats
-        user = User.query.get(user_id)
-        if user:
-            user.planners_created = (user.planners_created or 0) + 1
-            db.session.commit()
+        # Update user stats and unlock any achievement thresholds crossed
+        newly_unlocked = award_progress(user_id, planners_created=1)
+
+        db.session.commit()
 
-        return jsonify(planner.to_dict()), 201
+        planner_dict = planner.to_dict()
+        planner_dict['newly_unlocked'] = newly_unlocked
+        return jsonify(planner_dict), 201
 
     except Exception as e:
         db.session.rollback()
@@ -111,7 +129,25 @@ def delete_planner(planner_id):
         if not planner:
             return jsonify({'error': 'Planner not found'}), 404
 
-        db.session.delete(planner)
+        # Deleting a planner cascades to its tasks, so rebuild stats lazily
+        invalidate_stats(user_id)
+        record_planner_deletion(user_id, planner.id)
+        # Set-based deletes instead of the ORM cascade, which loads every
+        # task and then each task's subtasks one query at a time
+        task_ids = select(Task.id).where(Task.planner_id == planner.id)
+        delete_task_tags(task_ids)
+        db.session.execute(
+            delete(Subtask).where(Subtask.task_id.in_(task_ids)),
+            execution_options={'synchronize_session': False}
+        )
+        db.session.execute(
+            delete(Task).where(Task.planner_id == planner.id),
+            execution_options={'synchronize_session': False}
+        )
+        db.session.execute(delete(Planner).where(Planner.id == planner.id))
+
+        # Bulk statements bypass the unit of work, so record the change
+        mark_changed(user_id)
         db.session.commit()
 
         return jsonify({'message': 'Planner deleted successfully'}), 200
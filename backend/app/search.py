@@ -0,0 +1,131 @@
+import re
+from flask import Blueprint, request, jsonify
+from flask_jwt_extended import jwt_required, get_jwt_identity
+from sqlalchemy import func, literal_column, select, text
+from models import db, Task, Planner
+from app.serializers import (
+    TASK_COLUMNS, PLANNER_COLUMNS, task_serializer, planner_serializer, json_response
+)
+
+search_bp = Blueprint('search', __name__)
+
+DEFAULT_LIMIT = 20
+MAX_LIMIT = 100
+MAX_TERMS = 8
+
+# Postgres: generated tsvector columns with GIN indexes. Title/name weigh
+# most, then tags, then descriptions.
+PG_TASK_VECTOR = (
+    "setweight(to_tsvector('simple', coalesce(title, '')), 'A') || "
+    "setweight(to_tsvector('simple', coalesce(tags, '')), 'B') || "
+    "setweight(to_tsvector('simple', coalesce(description, '')), 'C')"
+)
+PG_PLANNER_VECTOR = (
+    "setweight(to_tsvector('simple', coalesce(name, '')), 'A') || "
+    "setweight(to_tsvector('simple', coalesce(description, '')), 'C')"
+)
+
+# SQLite: FTS5 tables keyed by the row id and kept current by triggers.
+# `owner` holds a u<user_id> token so MATCH only walks the user's rows.
+SQLITE_INDEXES = {
+    'tasks': ('tasks_fts', ('title', 'tags', 'description'), (10.0, 5.0, 1.0)),
+    'planners': ('planners_fts', ('name', 'description'), (10.0, 1.0)),
+}
+
+def create_search_index(conn):
+    """DDL for the search index of the connection's dialect (used by migrations)"""
+    if conn.dialect.name == 'postgresql':
+        for table, vector in (('tasks', PG_TASK_VECTOR), ('planners', PG_PLANNER_VECTOR)):
+            conn.execute(text(
+                f"ALTER TABLE {table} ADD COLUMN IF NOT EXISTS search_vector tsvector "
+                f"GENERATED ALWAYS AS ({vector}) STORED"
+            ))
+            conn.execute(text(f"CREATE INDEX IF NOT EXISTS ix_{table}_search ON {table} USING GIN (search_vector)"))
+        return
+
+    for table, (fts, columns, _) in SQLITE_INDEXES.items():
+        names = ', '.join(columns)
+        values = ', '.join(f'new.{c}' for c in columns)
+        insert_new = f"INSERT INTO {fts} (rowid, owner, {names}) VALUES (new.id, 'u' || new.user_id, {values});"
+        delete_old = f"DELETE FROM {fts} WHERE rowid = old.id;"
+
+        conn.execute(text(f"CREATE VIRTUAL TABLE IF NOT EXISTS {fts} USING fts5(owner, {names}, prefix='2 3')"))
+        conn.execute(text(f"CREATE TRIGGER IF NOT EXISTS {fts}_ai AFTER INSERT ON {table} BEGIN {insert_new} END"))
+        conn.execute(text(f"CREATE TRIGGER IF NOT EXISTS {fts}_ad AFTER DELETE ON {table} BEGIN {delete_old} END"))
+        conn.execute(text(
+            f"CREATE TRIGGER IF NOT EXISTS {fts}_au AFTER UPDATE OF user_id, {names} ON {table} "
+            f"BEGIN {delete_old} {insert_new} END"
+        ))
+        conn.execute(text(f"DELETE FROM {fts}"))
+        conn.execute(text(f"INSERT INTO {fts} (rowid, owner, {names}) SELECT id, 'u' || user_id, {names} FROM {table}"))
+
+def search_terms(q):
+    """Lowercased word tokens of a query, capped at MAX_TERMS"""
+    return re.findall(r'\w+', (q or '').lower())[:MAX_TERMS]
+
+def _pg_search(table, model, columns, user_id, terms, limit):
+    query = func.to_tsquery('simple', ' & '.join(f'{t}:*' for t in terms))
+    vector = literal_column(f'{table}.search_vector')
+    return db.session.execute(
+        select(*columns)
+        .where(model.user_id == user_id, vector.op('@@')(query))
+        .order_by(func.ts_rank(vector, query).desc(), model.id.desc())
+        .limit(limit)
+    ).all()
+
+def _sqlite_search(table, model, columns, user_id, terms, limit):
+    fts, fields, weights = SQLITE_INDEXES[table]
+    match = f"owner:u{int(user_id)} AND {{{' '.join(fields)}}}: (" + ' AND '.join(f'"{t}"*' for t in terms) + ')'
+    ids = db.session.execute(
+        text(
+            f"SELECT rowid FROM {fts} WHERE {fts} MATCH :match "
+            f"ORDER BY bm25({fts}, 0.0, {', '.join(str(w) for w in weights)}), rowid DESC LIMIT :limit"
+        ),
+        {'match': match, 'limit': limit}
+    ).scalars().all()
+    if not ids:
+        return []
+
+    rows = {row.id: row for row in db.session.execute(
+        select(*columns).where(model.id.in_(ids), model.user_id == user_id)
+    )}
+    return [rows[i] for i in ids if i in rows]
+
+def search(table, model, columns, user_id, terms, limit):
+    """Rows of `table` owned by the user matching every term as a prefix, best first"""
+    if db.session.get_bind().dialect.name == 'postgresql':
+        return _pg_search(table, model, columns, user_id, terms, limit)
+    return _sqlite_search(table, model, columns, user_id, terms, limit)
+
+@search_bp.route('/search', methods=['GET'])
+@jwt_required()
+def search_all():
+    """Search the current user's tasks and planners"""
+    try:
+        user_id = get_jwt_identity()
+        q = request.args.get('q', '')
+        scope = request.args.get('type', 'all')
+        if scope not in ('all', 'tasks', 'planners'):
+            return jsonify({'error': 'type must be all, tasks or planners'}), 400
+
+        try:
+            limit = min(max(int(request.args.get('limit', DEFAULT_LIMIT)), 1), MAX_LIMIT)
+        except ValueError:
+            return jsonify({'error': 'limit must be an integer'}), 400
+
+        terms = search_terms(q)
+        result = {'query': q, 'tasks': [], 'planners': []}
+        if not terms:
+            return json_response(result)
+
+        if scope in ('all', 'tasks'):
+            rows = search('tasks', Task, TASK_COLUMNS, user_id, terms, limit)
+            result['tasks'] = task_serializer.to_dicts(rows)
+        if scope in ('all', 'planners'):
+            rows = search('planners', Planner, PLANNER_COLUMNS, user_id, terms, limit)
+            result['planners'] = planner_serializer.to_dicts(rows)
+
+        return json_response(result)
+
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
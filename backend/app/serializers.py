@@ -0,0 +1,82 @@
+import json
+from datetime import datetime
+from flask import current_app
+from models import Task, Planner, Subtask, Achievement, UserAchievement
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - optional speedup
+    orjson = None
+
+# Column order is the key order of the serialized dicts (matches to_dict)
+TASK_COLUMNS = (
+    Task.id, Task.user_id, Task.planner_id, Task.title, Task.description,
+    Task.status, Task.priority, Task.due_date, Task.completed_at,
+    Task.created_at, Task.updated_at, Task.estimated_time, Task.actual_time,
+    Task.xp_reward, Task.tags
+)
+
+PLANNER_COLUMNS = (
+    Planner.id, Planner.user_id, Planner.name, Planner.type, Planner.color,
+    Planner.icon, Planner.description, Planner.is_favorite, Planner.created_at,
+    Planner.updated_at, Planner.target_frequency, Planner.target_value
+)
+
+SUBTASK_COLUMNS = (
+    Subtask.id, Subtask.task_id, Subtask.title, Subtask.completed,
+    Subtask.order, Subtask.created_at
+)
+
+UNLOCK_COLUMNS = (
+    UserAchievement.id, UserAchievement.achievement_id, Achievement.name,
+    Achievement.description, Achievement.icon, Achievement.xp_reward,
+    UserAchievement.unlocked_at
+)
+
+def _split_tags(value):
+    return value.split(',') if value else []
+
+class RowSerializer:
+    """Turns Core result rows into plain dicts without building ORM objects.
+
+    Keys and per-column converters are resolved once; datetimes are left
+    as-is and encoded by dumps().
+    """
+
+    def __init__(self, columns, converters=None):
+        self.keys = tuple(c.key for c in columns)
+        converters = converters or {}
+        self.converters = tuple((i, converters[k]) for i, k in enumerate(self.keys) if k in converters)
+
+    def to_dicts(self, rows):
+        keys = self.keys
+        if not self.converters:
+            return [dict(zip(keys, row)) for row in rows]
+
+        converters = self.converters
+        out = []
+        for row in rows:
+            values = list(row)
+            for i, convert in converters:
+                values[i] = convert(values[i])
+            out.append(dict(zip(keys, values)))
+        return out
+
+task_serializer = RowSerializer(TASK_COLUMNS, {'tags': _split_tags})
+planner_serializer = RowSerializer(PLANNER_COLUMNS)
+subtask_serializer = RowSerializer(SUBTASK_COLUMNS)
+unlock_serializer = RowSerializer(UNLOCK_COLUMNS)
+
+def _default(value):
+    if isinstance(value, datetime):
+        return value.isoformat()
+    raise TypeError(f'Object of type {type(value).__name__} is not JSON serializable')
+
+def dumps(payload):
+    """Encode to JSON bytes with orjson when installed, the stdlib otherwise"""
+    if orjson is not None:
+        return orjson.dumps(payload, option=orjson.OPT_NON_STR_KEYS)
+    return json.dumps(payload, default=_default, separators=(',', ':')).encode('utf-8')
+
+def json_response(payload, status=200):
+    return current_app.response_class(dumps(payload), status=status, mimetype='application/json')
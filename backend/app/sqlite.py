@@ -0,0 +1,56 @@
+import re
+import sqlite3
+import threading
+from sqlalchemy import event
+from sqlalchemy.exc import OperationalError
+
+# Statements that make pysqlite open a transaction (see isolation_level below)
+WRITE_STATEMENT = re.compile(r'^\s*(INSERT|UPDATE|DELETE|REPLACE)\b', re.IGNORECASE)
+
+LOCK_KEY = 'sqlite_write_lock'
+
+def configure_sqlite(engine, pragmas):
+    """Tune a SQLite engine for concurrent use.
+
+    Every new connection gets `pragmas`, and writes start with BEGIN IMMEDIATE
+    so they take the database write lock up front instead of failing when a
+    read transaction tries to upgrade. Within the process, write transactions
+    queue on a lock; across processes they wait up to busy_timeout in SQLite.
+    """
+    write_lock = threading.Lock()
+    wait = pragmas.get('busy_timeout', 5000) / 1000
+
+    @event.listens_for(engine, 'connect')
+    def set_pragmas(dbapi_connection, connection_record):
+        # pysqlite issues "BEGIN IMMEDIATE" before the first INSERT/UPDATE/
+        # DELETE of a transaction; plain reads keep running outside one
+        dbapi_connection.isolation_level = 'IMMEDIATE'
+        cursor = dbapi_connection.cursor()
+        for name, value in pragmas.items():
+            cursor.execute(f'PRAGMA {name} = {value}')
+        cursor.close()
+
+    @event.listens_for(engine, 'before_cursor_execute')
+    def acquire(conn, cursor, statement, parameters, context, executemany):
+        proxied = conn.connection
+        if proxied.info.get(LOCK_KEY) or proxied.dbapi_connection.in_transaction:
+            return
+        if not WRITE_STATEMENT.match(statement):
+            return
+        if not write_lock.acquire(timeout=wait):
+            raise OperationalError(statement, parameters, sqlite3.OperationalError('database is locked'))
+        proxied.info[LOCK_KEY] = True
+
+    def release(info):
+        if info.pop(LOCK_KEY, False):
+            write_lock.release()
+
+    # Checkin runs after the commit or reset rollback has finished, so the
+    # next writer never sees SQLite's lock still held
+    @event.listens_for(engine.pool, 'checkin')
+    def checkin(dbapi_connection, connection_record):
+        release(connection_record.info)
+
+    @event.listens_for(engine.pool, 'invalidate')
+    def invalidate(dbapi_connection, connection_record, exception):
+        release(connection_record.info)
@@ -0,0 +1,138 @@
+from collections import defaultdict
+from datetime import datetime, timedelta
+from flask import current_app
+from sqlalchemy import and_, case, delete, func, select, update
+from models import db, Task, Planner, UserStats
+from app.dialects import lock_user_row
+
+STATUSES = ('pending', 'in_progress', 'completed', 'cancelled')
+PRIORITIES = ('low', 'medium', 'high', 'urgent')
+
+COUNTER_COLUMNS = (
+    ['total_tasks']
+    + [f'{s}_tasks' for s in STATUSES]
+    + [f'{p}_priority' for p in PRIORITIES]
+    + ['total_planners']
+)
+
+def _count_if(condition):
+    return func.coalesce(func.sum(case((condition, 1), else_=0)), 0)
+
+def _week_ago():
+    return datetime.utcnow() - timedelta(days=7)
+
+def aggregate_counts(user_id):
+    """Every counter for a user in one conditional-aggregation query"""
+    total_planners = select(func.count(Planner.id)).where(
+        Planner.user_id == user_id
+    ).scalar_subquery()
+
+    columns = [func.count(Task.id).label('total_tasks')]
+    columns += [_count_if(Task.status == s).label(f'{s}_tasks') for s in STATUSES]
+    columns += [_count_if(Task.priority == p).label(f'{p}_priority') for p in PRIORITIES]
+    columns += [
+        _count_if(and_(Task.status == 'completed', Task.completed_at >= _week_ago())).label('completed_this_week'),
+        total_planners.label('total_planners')
+    ]
+
+    row = db.session.execute(select(*columns).where(Task.user_id == user_id)).one()
+    return dict(row._mapping)
+
+def completed_this_week(user_id):
+    """Indexed range count on (user_id, completed_at)"""
+    return db.session.query(func.count(Task.id)).filter(
+        Task.user_id == user_id,
+        Task.status == 'completed',
+        Task.completed_at >= _week_ago()
+    ).scalar()
+
+def materialized_counts(user_id):
+    """Counters from the user_stats row, building it on first use.
+
+    The build holds the user's row lock from the aggregate read to the
+    insert; task writers that find no row take the same lock (see _apply),
+    so a change cannot land between the two and be missed by both.
+    """
+    row = db.session.get(UserStats, user_id)
+    if row is None:
+        lock_user_row(user_id)
+        # Another request may have built it while we waited
+        row = db.session.get(UserStats, user_id)
+        if row is None:
+            counts = aggregate_counts(user_id)
+            db.session.add(UserStats(user_id=user_id, **{c: counts[c] for c in COUNTER_COLUMNS}))
+            db.session.commit()
+            return counts
+        db.session.commit()
+
+    counts = {c: getattr(row, c) for c in COUNTER_COLUMNS}
+    counts['completed_this_week'] = completed_this_week(user_id)
+    return counts
+
+def build_stats(counts):
+    """Shape counters into the /api/user/stats payload"""
+    total = counts['total_tasks']
+    completed = counts['completed_tasks']
+    return {
+        'total_planners': counts['total_planners'],
+        'total_tasks': total,
+        'completed_tasks': completed,
+        'pending_tasks': counts['pending_tasks'],
+        'in_progress_tasks': counts['in_progress_tasks'],
+        'completed_this_week': counts['completed_this_week'],
+        'completion_rate': round((completed / total * 100) if total > 0 else 0, 2),
+        'priority_distribution': {p: counts[f'{p}_priority'] for p in PRIORITIES if counts[f'{p}_priority']},
+        'status_distribution': {s: counts[f'{s}_tasks'] for s in STATUSES if counts[f'{s}_tasks']}
+    }
+
+def _task_columns(status, priority):
+    columns = ['total_tasks']
+    if status in STATUSES:
+        columns.append(f'{status}_tasks')
+    if priority in PRIORITIES:
+        columns.append(f'{priority}_priority')
+    return columns
+
+def _apply(user_id, deltas):
+    values = {c: getattr(UserStats, c) + d for c, d in deltas.items() if d}
+    if not values:
+        return
+
+    statement = update(UserStats).where(UserStats.user_id == user_id).values(**values)
+    result = db.session.execute(statement, execution_options={'synchronize_session': False})
+    if result.rowcount == 0 and current_app.config.get('MATERIALIZED_STATS'):
+        # No row, or one still being built: wait for the builder's lock and
+        # retry, so the change lands in a row whose aggregate could not see it
+        lock_user_row(user_id)
+        db.session.execute(statement, execution_options={'synchronize_session': False})
+
+def record_task_change(user_id, before=None, after=None):
+    """Adjust counters for a task going from `before` to `after`.
+
+    Both are (status, priority) tuples; None means the task did not exist
+    (create) or no longer exists (delete). Runs in the caller's transaction
+    and is a no-op until the user's stats row has been built.
+    """
+    record_task_changes(user_id, [(before, after)])
+
+def record_task_changes(user_id, changes):
+    """Apply many (before, after) task changes as a single UPDATE"""
+    deltas = defaultdict(int)
+    for before, after in changes:
+        if before:
+            for column in _task_columns(*before):
+                deltas[column] -= 1
+        if after:
+            for column in _task_columns(*after):
+                deltas[column] += 1
+    _apply(user_id, deltas)
+
+def record_planner_change(user_id, delta):
+    _apply(user_id, {'total_planners': delta})
+
+def invalidate_stats(user_id):
+    """Drop the stats row so the next read rebuilds it from tasks"""
+    db.session.execute(
+        delete(UserStats).where(UserStats.user_id == user_id),
+        execution_options={'synchronize_session': False}
+    )
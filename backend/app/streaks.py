@@ -0,0 +1,98 @@
+from datetime import datetime, timedelta
+from sqlalchemy import case, delete, func, insert, select, update
+from models import db, User, Task, DailyActivity
+from app.dialects import dialect_insert
+from app.etag import mark_changed
+from app.user_loader import evict_user
+
+BACKFILL_CHUNK_SIZE = 1000
+
+users = User.__table__
+
+def record_activity(user_id, completed, day=None):
+    """Add completions to the user's row for the day (one upsert)"""
+    day = day or datetime.utcnow().date()
+    stmt = dialect_insert(DailyActivity).values(user_id=int(user_id), day=day, tasks_completed=completed)
+    db.session.execute(stmt.on_conflict_do_update(
+        index_elements=['user_id', 'day'],
+        set_={'tasks_completed': DailyActivity.tasks_completed + stmt.excluded.tasks_completed}
+    ))
+
+def streak_values(day=None):
+    """SET clauses advancing the streak for activity on `day`.
+
+    Runs as part of the user's UPDATE: the same day keeps the streak, the
+    day after the last activity extends it, anything later restarts it.
+    """
+    day = day or datetime.utcnow().date()
+    last = users.c.last_active_on
+    current = func.coalesce(users.c.streak, 0)
+    streak = case((last >= day, current), (last == day - timedelta(days=1), current + 1), else_=1)
+    return {
+        'streak': streak,
+        'longest_streak': case(
+            (streak > func.coalesce(users.c.longest_streak, 0), streak),
+            else_=func.coalesce(users.c.longest_streak, 0)
+        ),
+        'last_active_on': case((last > day, last), else_=day)
+    }
+
+def streaks_from_days(days):
+    """(current, longest, last_day) for an ascending list of active days"""
+    current = longest = 0
+    previous = None
+    for day in days:
+        current = current + 1 if previous and day - previous == timedelta(days=1) else 1
+        longest = max(longest, current)
+        previous = day
+    return current, longest, previous
+
+def backfill(chunk_size=BACKFILL_CHUNK_SIZE):
+    """Rebuild daily_activity from Task.completed_at and recompute streaks.
+
+    Works through users in id order, one chunk per transaction. Task history
+    is only scanned here; completions afterwards update the rollup directly.
+    Returns the number of users processed.
+    """
+    day = func.date(Task.completed_at)
+    processed = 0
+    last_id = 0
+    while True:
+        ids = db.session.execute(
+            select(users.c.id).where(users.c.id > last_id).order_by(users.c.id).limit(chunk_size)
+        ).scalars().all()
+        if not ids:
+            return processed
+
+        db.session.execute(delete(DailyActivity).where(DailyActivity.user_id.in_(ids)))
+        db.session.execute(insert(DailyActivity).from_select(
+            ['user_id', 'day', 'tasks_completed'],
+            select(Task.user_id, day, func.count())
+            .where(Task.user_id.in_(ids), Task.completed_at.isnot(None))
+            .group_by(Task.user_id, day)
+        ))
+
+        days = {user_id: [] for user_id in ids}
+        for user_id, active_day in db.session.execute(
+            select(DailyActivity.user_id, DailyActivity.day)
+            .where(DailyActivity.user_id.in_(ids))
+            .order_by(DailyActivity.user_id, DailyActivity.day)
+        ):
+            days[user_id].append(active_day)
+
+        rows = []
+        for user_id, active_days in days.items():
+            current, longest, last_day = streaks_from_days(active_days)
+            rows.append({'uid': user_id, 'streak': current, 'longest_streak': longest, 'last_active_on': last_day})
+        db.session.execute(
+            update(users).where(users.c.id == db.bindparam('uid')),
+            rows
+        )
+
+        for user_id in ids:
+            evict_user(user_id)
+            mark_changed(user_id)
+        db.session.commit()
+
+        processed += len(ids)
+        last_id = ids[-1]
@@ -0,0 +1,156 @@
+import base64
+from datetime import datetime, timedelta
+from flask import Blueprint, request, jsonify
+from flask_jwt_extended import jwt_required, get_jwt_identity
+from sqlalchemy import insert, literal, select, update
+from models import db, Planner, Task, Subtask, UserAchievement, DeletedRecord
+from app.gamification import get_catalog
+from app.serializers import (
+    TASK_COLUMNS, PLANNER_COLUMNS, SUBTASK_COLUMNS,
+    task_serializer, planner_serializer, subtask_serializer, json_response
+)
+
+sync_bp = Blueprint('sync', __name__)
+
+# Tokens point slightly into the past so rows flushed before, but committed
+# after, the previous sync are not missed. Clients upsert by id.
+SYNC_OVERLAP = timedelta(seconds=5)
+
+class InvalidSyncToken(ValueError):
+    """Raised when a client sends a malformed sync token"""
+
+def encode_token(moment):
+    return base64.urlsafe_b64encode(moment.isoformat().encode('utf-8')).decode('ascii').rstrip('=')
+
+def decode_token(token):
+    try:
+        padded = token + '=' * (-len(token) % 4)
+        return datetime.fromisoformat(base64.urlsafe_b64decode(padded.encode('ascii')).decode('utf-8'))
+    except (ValueError, UnicodeError):
+        raise InvalidSyncToken('Invalid sync token')
+
+def record_deletions(user_id, entity, ids):
+    """Write tombstones for hard-deleted rows in the caller's transaction"""
+    ids = list(ids)
+    if ids:
+        now = datetime.utcnow()
+        db.session.execute(insert(DeletedRecord), [
+            {'user_id': user_id, 'entity': entity, 'entity_id': entity_id, 'deleted_at': now}
+            for entity_id in ids
+        ])
+
+TOMBSTONE_COLUMNS = ['user_id', 'entity', 'entity_id', 'deleted_at']
+
+def _subtask_tombstones(now):
+    """SELECT of subtask tombstones (one per subtask joined to its task), to filter"""
+    return select(
+        Task.user_id, literal('subtask'), Subtask.id, literal(now, DeletedRecord.deleted_at.type)
+    ).join(Task, Task.id == Subtask.task_id)
+
+def record_task_deletions(user_id, task_ids):
+    """Tombstones for deleted tasks and the subtasks their delete cascades to"""
+    from app.tasks import _chunks
+
+    task_ids = list(task_ids)
+    now = datetime.utcnow()
+    for chunk in _chunks(task_ids):
+        db.session.execute(insert(DeletedRecord).from_select(
+            TOMBSTONE_COLUMNS, _subtask_tombstones(now).where(Subtask.task_id.in_(chunk))
+        ))
+    record_deletions(user_id, 'task', task_ids)
+
+def record_planner_deletion(user_id, planner_id):
+    """Tombstones for a planner and the tasks and subtasks its delete cascades to"""
+    now = datetime.utcnow()
+    db.session.execute(insert(DeletedRecord).from_select(
+        TOMBSTONE_COLUMNS,
+        _subtask_tombstones(now).where(Task.planner_id == planner_id, Task.user_id == user_id)
+    ))
+    db.session.execute(insert(DeletedRecord).from_select(
+        TOMBSTONE_COLUMNS,
+        select(Task.user_id, literal('task'), Task.id, literal(now, DeletedRecord.deleted_at.type))
+        .where(Task.planner_id == planner_id, Task.user_id == user_id)
+    ))
+    record_deletions(user_id, 'planner', [planner_id])
+
+def touch_task(task_id):
+    """Bump a task's updated_at so subtask changes show up in the next sync"""
+    db.session.execute(
+        update(Task).where(Task.id == task_id).values(updated_at=datetime.utcnow()),
+        execution_options={'synchronize_session': False}
+    )
+
+@sync_bp.route('/sync', methods=['GET'])
+@jwt_required()
+def sync():
+    """Return rows created, changed or deleted since a sync token"""
+    from app.tasks import _chunks
+
+    try:
+        user_id = get_jwt_identity()
+        token = request.args.get('since')
+        since = decode_token(token) if token else None
+        started = datetime.utcnow()
+
+        tasks = select(*TASK_COLUMNS).where(Task.user_id == user_id)
+        planners = select(*PLANNER_COLUMNS).where(Planner.user_id == user_id)
+        unlocks = UserAchievement.query.filter(UserAchievement.user_id == user_id)
+        if since:
+            tasks = tasks.where(Task.updated_at > since)
+            planners = planners.where(Planner.updated_at > since)
+            unlocks = unlocks.filter(UserAchievement.unlocked_at > since)
+        tasks = task_serializer.to_dicts(db.session.execute(tasks).all())
+        planners = planner_serializer.to_dicts(db.session.execute(planners).all())
+
+        # Subtask changes also touch their task, so only changed tasks need a look
+        subtasks = []
+        for chunk in _chunks([t['id'] for t in tasks]):
+            query = select(*SUBTASK_COLUMNS).where(Subtask.task_id.in_(chunk))
+            if since:
+                query = query.where(Subtask.updated_at > since)
+            subtasks += subtask_serializer.to_dicts(db.session.execute(query).all())
+
+        deleted = {'tasks': [], 'subtasks': [], 'planners': []}
+        if since:
+            rows = db.session.execute(
+                select(DeletedRecord.entity, DeletedRecord.entity_id).where(
+                    DeletedRecord.user_id == user_id,
+                    DeletedRecord.deleted_at > since
+                )
+            ).all()
+            # SQLite hands the id of a deleted row to the next insert; a live
+            # row can only carry that id if it was created after the delete
+            live = {
+                'tasks': {t['id'] for t in tasks},
+                'subtasks': {s['id'] for s in subtasks},
+                'planners': {p['id'] for p in planners},
+            }
+            for entity, entity_id in rows:
+                key = entity + 's'
+                if entity_id not in live.get(key, ()):
+                    deleted.setdefault(key, []).append(entity_id)
+
+        catalog = get_catalog()
+        achievements = []
+        for ua in unlocks.all():
+            achievements.append({
+                'id': ua.id,
+                'user_id': ua.user_id,
+                'achievement': catalog.by_id.get(ua.achievement_id),
+                'unlocked_at': ua.unlocked_at.isoformat() if ua.unlocked_at else None
+            })
+
+        return json_response({
+            'full': since is None,
+            'tasks': tasks,
+            'subtasks': subtasks,
+            'planners': planners,
+            'achievements': achievements,
+            'deleted': deleted,
+            'token': encode_token(started - SYNC_OVERLAP)
+        })
+
+    except InvalidSyncToken as e:
+        return jsonify({'error': str(e)}), 400
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
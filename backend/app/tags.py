@@ -0,0 +1,89 @@
+from flask import Blueprint, jsonify
+from flask_jwt_extended import jwt_required, get_jwt_identity
+from sqlalchemy import delete, func, insert, select
+from models import db, Task, Tag, TaskTag
+from app.dialects import dialect_insert
+from app.etag import conditional
+
+tags_bp = Blueprint('tags', __name__)
+
+MAX_TAG_LENGTH = 100
+
+def split_tags(value):
+    """Distinct, trimmed tag names from a comma-joined Task.tags value"""
+    names = []
+    for name in (value or '').split(','):
+        name = name.strip()[:MAX_TAG_LENGTH]
+        if name and name not in names:
+            names.append(name)
+    return names
+
+def tag_ids(user_id, names):
+    """Map tag names to ids, creating the tags that do not exist yet"""
+    names = set(names)
+    if not names:
+        return {}
+
+    db.session.execute(
+        dialect_insert(Tag).on_conflict_do_nothing()
+        .values([{'user_id': int(user_id), 'name': name} for name in names])
+    )
+    return dict(db.session.execute(
+        select(Tag.name, Tag.id).where(Tag.user_id == int(user_id), Tag.name.in_(names))
+    ).all())
+
+def set_task_tags(user_id, tags_by_task, replace=True):
+    """Point task_tags at the tags in each task's comma-joined tags value.
+
+    `tags_by_task` maps task id to Task.tags. Pass replace=False for tasks
+    that were just inserted and cannot have links yet.
+    """
+    names_by_task = {task_id: split_tags(tags) for task_id, tags in tags_by_task.items()}
+    if not names_by_task:
+        return
+
+    if replace:
+        delete_task_tags(list(names_by_task))
+
+    ids = tag_ids(user_id, {name for names in names_by_task.values() for name in names})
+    rows = [
+        {'task_id': task_id, 'tag_id': ids[name]}
+        for task_id, names in names_by_task.items() for name in names
+    ]
+    if rows:
+        db.session.execute(insert(TaskTag), rows)
+
+def delete_task_tags(task_ids):
+    """Drop the tag links of tasks about to be deleted (a list or a select of ids)"""
+    db.session.execute(delete(TaskTag).where(TaskTag.task_id.in_(task_ids)))
+
+def tagged(stmt, user_id, name):
+    """Restrict a select() over tasks to those carrying a tag"""
+    return stmt.join(TaskTag, TaskTag.task_id == Task.id).join(Tag, Tag.id == TaskTag.tag_id).where(
+        Tag.user_id == user_id,
+        Tag.name == name.strip()
+    )
+
+@tags_bp.route('/tags', methods=['GET'])
+@jwt_required()
+@conditional()
+def get_tags():
+    """Get the current user's tags with the number of tasks using each"""
+    try:
+        user_id = get_jwt_identity()
+
+        usage = func.count(TaskTag.task_id)
+        rows = db.session.execute(
+            select(Tag.name, usage)
+            .join(TaskTag, TaskTag.tag_id == Tag.id)
+            .where(Tag.user_id == user_id)
+            .group_by(Tag.id, Tag.name)
+            .order_by(usage.desc(), Tag.name)
+        ).all()
+
+        return jsonify({
+            'tags': [{'name': name, 'count': count} for name, count in rows]
+        }), 200
+
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
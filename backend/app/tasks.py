@@ -1,18 +1,193 @@
 from flask import Blueprint, request, jsonify
 from flask_jwt_extended import jwt_required, get_jwt_identity
-from models import db, User, Task, Subtask
+from models import db, Planner, Task, Subtask
+from app.pagination import InvalidCursor, wants_page, page_size, paginate
+from app.stats import record_task_change, record_task_changes
+from app.gamification import award_progress
+from app.etag import conditional, mark_changed
+from app.sync import record_deletions, record_task_deletions, touch_task
+from app.serializers import TASK_COLUMNS, task_serializer, json_response
+from app.tags import set_task_tags, delete_task_tags, tagged
 from datetime import datetime
-import json
+from sqlalchemy import case, delete, func, insert, select
 
 tasks_bp = Blueprint('tasks', __name__)
 
+MAX_BATCH_OPERATIONS = 500
+
+# Keeps IN (...) lists well below database bind-parameter limits
+IN_CHUNK_SIZE = 500
+
+TASK_STATUSES = ('pending', 'in_progress', 'completed', 'cancelled')
+TASK_PRIORITIES = ('low', 'medium', 'high', 'urgent')
+
+# Integer columns are 32-bit on Postgres
+INT_MAX = 2 ** 31 - 1
+
 def calculate_xp(priority):
     """Calculate XP based on priority"""
     xp_map = {'low': 5, 'medium': 10, 'high': 20, 'urgent': 30}
     return xp_map.get(priority, 10)
 
+def parse_tags(tags):
+    """Tags arrive as a list and are stored comma-joined"""
+    if isinstance(tags, list):
+        tags = ','.join(tags)
+    return tags
+
+def parse_due_date(value):
+    return datetime.fromisoformat(value + 'T00:00:00')
+
+def _check_int(data, field):
+    value = data.get(field)
+    if value is None:
+        return
+    if not isinstance(value, int) or isinstance(value, bool):
+        raise TypeError(f'{field} must be an integer')
+    if abs(value) > INT_MAX:
+        raise ValueError(f'{field} is out of range')
+
+def check_task_data(data, planner_ids):
+    """Raise ValueError/TypeError for a payload new_task_values/apply_task_update can't apply.
+    `planner_ids` holds the ids of the user's planners the payload may reference."""
+    if not isinstance(data, dict):
+        raise TypeError('data must be an object')
+
+    if 'title' in data:
+        if not isinstance(data['title'], str) or not data['title'].strip():
+            raise ValueError('title must be a non-empty string')
+        if len(data['title']) > 500:
+            raise ValueError('title is longer than 500 characters')
+    if data.get('description') is not None and not isinstance(data['description'], str):
+        raise TypeError('description must be a string')
+    if 'priority' in data and data['priority'] not in TASK_PRIORITIES:
+        raise ValueError(f"priority must be one of {', '.join(TASK_PRIORITIES)}")
+    if 'status' in data and data['status'] not in TASK_STATUSES:
+        raise ValueError(f"status must be one of {', '.join(TASK_STATUSES)}")
+    _check_int(data, 'duration')
+    _check_int(data, 'actual_time')
+
+    tags = data.get('tags')
+    if isinstance(tags, list):
+        if not all(isinstance(tag, str) for tag in tags):
+            raise TypeError('tags must be a list of strings or a string')
+    elif tags is not None and not isinstance(tags, str):
+        raise TypeError('tags must be a list of strings or a string')
+    if len(parse_tags(tags) or '') > 500:
+        raise ValueError('tags are longer than 500 characters')
+
+    planner_id = data.get('planner_id')
+    if planner_id is not None:
+        if not isinstance(planner_id, int) or isinstance(planner_id, bool):
+            raise TypeError('planner_id must be an integer')
+        if planner_id not in planner_ids:
+            raise ValueError('Planner not found')
+
+    if data.get('date'):
+        if not isinstance(data['date'], str):
+            raise TypeError('date must be a YYYY-MM-DD string')
+        parse_due_date(data['date'])
+
+def new_task_values(user_id, data):
+    """Column values for a task created from a POST payload"""
+    priority = data.get('priority', 'medium')
+    return {
+        'user_id': user_id,
+        'planner_id': data.get('planner_id'),
+        'title': data.get('title', 'New Task'),
+        'description': data.get('description'),
+        'status': 'pending',
+        'priority': priority,
+        'due_date': parse_due_date(data['date']) if data.get('date') else None,
+        'tags': parse_tags(data.get('tags', [])),
+        'estimated_time': data.get('duration'),
+        'xp_reward': calculate_xp(priority)
+    }
+
+def apply_task_update(task, data):
+    """Apply a PUT payload to a task. Returns True when it completes the task."""
+    previous_status = task.status
+
+    task.title = data.get('title', task.title)
+    task.description = data.get('description', task.description)
+    task.priority = data.get('priority', task.priority)
+    task.status = data.get('status', task.status)
+    task.estimated_time = data.get('duration', task.estimated_time)
+    task.actual_time = data.get('actual_time', task.actual_time)
+
+    if 'tags' in data:
+        task.tags = parse_tags(data['tags'])
+
+    if data.get('date'):
+        task.due_date = parse_due_date(data['date'])
+
+    if data.get('status') == 'completed' and previous_status != 'completed':
+        task.completed_at = datetime.utcnow()
+        return True
+    return False
+
+def apply_task_toggle(task, completed):
+    """Mark a task completed or pending. Returns True when it completes the task."""
+    if completed:
+        task.status = 'completed'
+        if not task.completed_at:
+            task.completed_at = datetime.utcnow()
+            return True
+    else:
+        task.status = 'pending'
+        task.completed_at = None
+    return False
+
+def _chunks(ids):
+    for i in range(0, len(ids), IN_CHUNK_SIZE):
+        yield ids[i:i + IN_CHUNK_SIZE]
+
+def embed_subtasks(task_dicts, include):
+    """Nest subtasks or subtask counts into task dicts with one query per chunk"""
+    ids = [t['id'] for t in task_dicts]
+    if not ids:
+        return task_dicts
+
+    if 'subtasks' in include:
+        grouped = {}
+        for chunk in _chunks(ids):
+            rows = Subtask.query.filter(Subtask.task_id.in_(chunk)).order_by(
+                Subtask.task_id, Subtask.order
+            ).all()
+            for subtask in rows:
+                grouped.setdefault(subtask.task_id, []).append(subtask.to_dict())
+        for t in task_dicts:
+            t['subtasks'] = grouped.get(t['id'], [])
+
+    if 'subtask_counts' in include:
+        counts = {}
+        for chunk in _chunks(ids):
+            rows = db.session.query(
+                Subtask.task_id,
+                func.count(Subtask.id),
+                func.coalesce(func.sum(case((Subtask.completed.is_(True), 1), else_=0)), 0)
+            ).filter(Subtask.task_id.in_(chunk)).group_by(Subtask.task_id).all()
+            for task_id, total, completed in rows:
+                counts[task_id] = {'total': total, 'completed': completed}
+        for t in task_dicts:
+            t['subtask_counts'] = counts.get(t['id'], {'total': 0, 'completed': 0})
+
+    return task_dicts
+
+def award_completions(user_id, tasks):
+    """Award XP for completed tasks and unlock any achievement thresholds crossed"""
+    if not tasks:
+        return []
+
+    return award_progress(
+        user_id,
+        [(task.xp_reward or 0, 'task_completed', task.id) for task in tasks],
+        tasks_completed=len(tasks)
+    )
+
 @tasks_bp.route('/tasks', methods=['GET'])
 @jwt_required()
+@conditional()
 def get_tasks():
     """Get all tasks for current user"""
     try:
@@ -20,18 +195,32 @@ def get_tasks():
         planner_id = request.args.get('planner_id')
         status = request.args.get('status')
         priority = request.args.get('priority')
+        tag = request.args.get('tag')
 
-        query = Task.query.filter_by(user_id=user_id)
+        stmt = select(*TASK_COLUMNS).where(Task.user_id == user_id)
+        if tag:
+            stmt = tagged(stmt, user_id, tag)
         if planner_id:
-            query = query.filter_by(planner_id=planner_id)
+            stmt = stmt.where(Task.planner_id == planner_id)
         if status:
-            query = query.filter_by(status=status)
+            stmt = stmt.where(Task.status == status)
         if priority:
-            query = query.filter_by(priority=priority)
+            stmt = stmt.where(Task.priority == priority)
+
+        include = set(filter(None, request.args.get('include', '').split(',')))
 
-        tasks = query.order_by(Task.created_at.desc()).all()
-        return jsonify([t.to_dict() for t in tasks]), 200
+        if wants_page():
+            rows, next_cursor = paginate(stmt, Task, page_size(), request.args.get('cursor'))
+            return json_response({
+                'tasks': embed_subtasks(task_serializer.to_dicts(rows), include),
+                'next_cursor': next_cursor
+            })
 
+        rows = db.session.execute(stmt.order_by(Task.created_at.desc())).all()
+        return json_response(embed_subtasks(task_serializer.to_dicts(rows), include))
+
+    except InvalidCursor as e:
+        return jsonify({'error': str(e)}), 400
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
@@ -43,32 +232,11 @@ def create_task():
         user_id = get_jwt_identity()
         data = request.get_json()
 
-        # Parse tags
-        tags = data.get('tags', [])
-        if isinstance(tags, list):
-            tags = ','.join(tags)
-
-        # Calculate XP
-        priority = data.get('priority', 'medium')
-        xp_reward = calculate_xp(priority)
-
-        # Parse due date
-        due_date = None
-        if data.get('date'):
-            due_date = datetime.fromisoformat(data['date'] + 'T00:00:00')
-
-        task = Task(
-            user_id=user_id,
-            planner_id=data.get('planner_id'),
-            title=data.get('title', 'New Task'),
-            description=data.get('description'),
-            priority=priority,
-            due_date=due_date,
-            tags=tags,
-            estimated_time=data.get('duration'),
-            xp_reward=xp_reward
-        )
+        task = Task(**new_task_values(user_id, data))
         db.session.add(task)
+        db.session.flush()
+        set_task_tags(user_id, {task.id: task.tags}, replace=False)
+        record_task_change(user_id, after=('pending', task.priority))
         db.session.commit()
 
         return jsonify(task.to_dict()), 201
@@ -108,44 +276,20 @@ def update_task(task_id):
             return jsonify({'error': 'Task not found'}), 404
 
         data = request.get_json()
+        previous = (task.status, task.priority)
 
-        # Update fields
-        task.title = data.get('title', task.title)
-        task.description = data.get('description', task.description)
-        task.priority = data.get('priority', task.priority)
-        task.status = data.get('status', task.status)
-        task.estimated_time = data.get('duration', task.estimated_time)
-        task.actual_time = data.get('actual_time', task.actual_time)
-
-        # Parse tags
+        newly_unlocked = []
+        if apply_task_update(task, data):
+            newly_unlocked = award_completions(user_id, [task])
         if 'tags' in data:
-            tags = data['tags']
-            if isinstance(tags, list):
-                tags = ','.join(tags)
-            task.tags = tags
-
-        # Parse due date
-        if data.get('date'):
-            task.due_date = datetime.fromisoformat(data['date'] + 'T00:00:00')
-
-        # Handle task completion
-        if data.get('status') == 'completed' and task.status != 'completed':
-            task.completed_at = datetime.utcnow()
-            # Award XP to user
-            user = User.query.get(user_id)
-            if user:
-                user.xp += task.xp_reward
-                user.total_xp += task.xp_reward
-                user.tasks_completed += 1
-
-                # Level up logic (every 100 XP)
-                new_level = (user.total_xp // 100) + 1
-                if new_level > user.level:
-                    user.level = new_level
+            set_task_tags(user_id, {task.id: task.tags})
 
+        record_task_change(user_id, before=previous, after=(task.status, task.priority))
         db.session.commit()
 
-        return jsonify(task.to_dict()), 200
+        task_dict = task.to_dict()
+        task_dict['newly_unlocked'] = newly_unlocked
+        return jsonify(task_dict), 200
 
     except Exception as e:
         db.session.rollback()
@@ -162,7 +306,18 @@ def delete_task(task_id):
         if not task:
             return jsonify({'error': 'Task not found'}), 404
 
-        db.session.delete(task)
+        record_task_change(user_id, before=(task.status, task.priority))
+        record_task_deletions(user_id, [task.id])
+        delete_task_tags([task.id])
+        # Set-based deletes; the ORM cascade would load the subtasks first
+        db.session.execute(
+            delete(Subtask).where(Subtask.task_id == task.id),
+            execution_options={'synchronize_session': False}
+        )
+        db.session.execute(delete(Task).where(Task.id == task.id))
+
+        # Bulk statements bypass the unit of work, so record the change
+        mark_changed(user_id)
         db.session.commit()
 
         return jsonify({'message': 'Task deleted successfully'}), 200
@@ -184,29 +339,164 @@ def toggle_task(task_id):
 
         data = request.get_json()
         completed = data.get('completed', False)
+        previous = (task.status, task.priority)
 
-        if completed:
-            task.status = 'completed'
-            if not task.completed_at:
-                task.completed_at = datetime.utcnow()
-                # Award XP to user
-                user = User.query.get(user_id)
-                if user:
-                    user.xp += task.xp_reward
-                    user.total_xp += task.xp_reward
-                    user.tasks_completed += 1
-
-                    # Level up logic (every 100 XP)
-                    new_level = (user.total_xp // 100) + 1
-                    if new_level > user.level:
-                        user.level = new_level
-        else:
-            task.status = 'pending'
-            task.completed_at = None
+        newly_unlocked = []
+        if apply_task_toggle(task, completed):
+            newly_unlocked = award_completions(user_id, [task])
+
+        record_task_change(user_id, before=previous, after=(task.status, task.priority))
+        db.session.commit()
+
+        task_dict = task.to_dict()
+        task_dict['newly_unlocked'] = newly_unlocked
+        return jsonify(task_dict), 200
+
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({'error': str(e)}), 500
+
+def apply_batch_operation(user_id, index, op, tasks, planner_ids, results, creates, deleted, changes, completed, retagged):
+    """Validate one batch operation and apply it to the loaded tasks, recording its result"""
+    kind = op.get('op') if isinstance(op, dict) else None
+
+    if kind == 'create':
+        data = op.get('data') or {}
+        check_task_data(data, planner_ids)
+        values = new_task_values(user_id, data)
+        creates.append((index, values))
+        changes.append((None, ('pending', values['priority'])))
+        return
+
+    if kind not in ('update', 'toggle', 'delete'):
+        results[index] = {'index': index, 'status': 400, 'error': 'Unknown operation'}
+        return
+
+    task_id = op.get('id')
+    if not isinstance(task_id, int) or isinstance(task_id, bool):
+        raise TypeError('id must be an integer')
+
+    task = tasks.get(task_id)
+    if not task or task.id in deleted:
+        results[index] = {'index': index, 'status': 404, 'error': 'Task not found'}
+        return
+
+    previous = (task.status, task.priority)
+
+    if kind == 'delete':
+        deleted.add(task.id)
+        changes.append((previous, None))
+        results[index] = {'index': index, 'status': 200, 'id': task.id}
+        return
+
+    if kind == 'update':
+        data = op.get('data') or {}
+        check_task_data(data, planner_ids)
+        completed_now = apply_task_update(task, data)
+        if 'tags' in data:
+            retagged[task.id] = task
+    else:
+        completed_now = apply_task_toggle(task, op.get('completed', False))
+
+    if completed_now:
+        completed.append(task)
+    changes.append((previous, (task.status, task.priority)))
+    results[index] = {'index': index, 'status': 200, 'task': task}
+
+@tasks_bp.route('/tasks/batch', methods=['POST'])
+@jwt_required()
+def batch_tasks():
+    """Apply many create/update/toggle/delete operations in one transaction"""
+    try:
+        user_id = get_jwt_identity()
+        data = request.get_json() or {}
+        operations = data.get('operations')
+
+        if not isinstance(operations, list) or not operations:
+            return jsonify({'error': 'operations must be a non-empty list'}), 400
+
+        if len(operations) > MAX_BATCH_OPERATIONS:
+            return jsonify({'error': f'At most {MAX_BATCH_OPERATIONS} operations per batch'}), 400
+
+        # Load every referenced task in one query
+        ids = {
+            op.get('id') for op in operations
+            if isinstance(op, dict) and isinstance(op.get('id'), int) and not isinstance(op.get('id'), bool)
+        }
+        tasks = {}
+        if ids:
+            tasks = {t.id: t for t in Task.query.filter(Task.user_id == user_id, Task.id.in_(ids)).all()}
+
+        # Planners the operations assign, narrowed to the user's own
+        planner_ids = {
+            op['data'].get('planner_id') for op in operations
+            if isinstance(op, dict) and isinstance(op.get('data'), dict)
+            and isinstance(op['data'].get('planner_id'), int) and not isinstance(op['data'].get('planner_id'), bool)
+        }
+        if planner_ids:
+            planner_ids = set(db.session.scalars(
+                select(Planner.id).where(Planner.user_id == user_id, Planner.id.in_(planner_ids))
+            ))
+
+        results = [None] * len(operations)
+        creates = []
+        deleted = set()
+        changes = []
+        completed = []
+        retagged = {}
+
+        for index, op in enumerate(operations):
+            try:
+                apply_batch_operation(user_id, index, op, tasks, planner_ids, results, creates, deleted, changes, completed, retagged)
+            except (ValueError, TypeError) as e:
+                # Payloads are validated before any task is modified
+                results[index] = {'index': index, 'status': 400, 'error': str(e)}
+
+        # Creates go out as one multi-row INSERT
+        if creates:
+            created = db.session.scalars(
+                insert(Task).returning(Task, sort_by_parameter_order=True),
+                [values for _, values in creates]
+            ).all()
+            for (index, _), task in zip(creates, created):
+                results[index] = {'index': index, 'status': 201, 'task': task}
+            set_task_tags(user_id, {task.id: task.tags for task in created}, replace=False)
+
+        # Tag links are rewritten only for tasks whose tags changed
+        retagged = {task_id: task.tags for task_id, task in retagged.items() if task_id not in deleted}
+        if retagged:
+            set_task_tags(user_id, retagged)
+
+        # Deletes go out as two set-based DELETEs
+        if deleted:
+            delete_task_tags(deleted)
+            db.session.execute(
+                delete(Subtask).where(Subtask.task_id.in_(deleted)),
+                execution_options={'synchronize_session': False}
+            )
+            db.session.execute(delete(Task).where(Task.id.in_(deleted)))
+            record_task_deletions(user_id, deleted)
+
+        # Bulk statements bypass the unit of work, so record the change
+        mark_changed(user_id)
+
+        # XP is awarded once for every completion in the batch
+        newly_unlocked = award_completions(user_id, completed)
+        record_task_changes(user_id, changes)
+
+        # Serialize before the commit expires the tasks, which would reload them one by one
+        db.session.flush()
+        for result in results:
+            task = result.pop('task', None)
+            if task is not None:
+                result['task'] = None if task.id in deleted else task.to_dict()
 
         db.session.commit()
 
-        return jsonify(task.to_dict()), 200
+        return jsonify({
+            'results': results,
+            'newly_unlocked': newly_unlocked
+        }), 200
 
     except Exception as e:
         db.session.rollback()
@@ -231,6 +521,7 @@ def create_subtask(task_id):
             order=data.get('order', 0)
         )
         db.session.add(subtask)
+        touch_task(task_id)
         db.session.commit()
 
         return jsonify(subtask.to_dict()), 201
@@ -256,6 +547,7 @@ def toggle_subtask(task_id, subtask_id):
 
         # Toggle completion
         subtask.completed = not subtask.completed
+        touch_task(task_id)
         db.session.commit()
 
         return jsonify(subtask.to_dict()), 200
@@ -279,6 +571,8 @@ def delete_subtask(task_id, subtask_id):
         if not subtask:
             return jsonify({'error': 'Subtask not found'}), 404
 
+        record_deletions(user_id, 'subtask', [subtask.id])
+        touch_task(task_id)
         db.session.delete(subtask)
         db.session.commit()
 
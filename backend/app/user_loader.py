@@ -0,0 +1,129 @@
+import threading
+import time
+from collections import OrderedDict
+from flask import current_app
+from sqlalchemy import event
+from sqlalchemy.orm import Session, make_transient_to_detached
+from sqlalchemy.orm.util import identity_key
+from models import db, User
+
+USER_COLUMNS = tuple(c.key for c in User.__table__.columns)
+
+class UserCache:
+    """Bounded per-process LRU of user column snapshots with a TTL.
+
+    Entries are evicted after any commit that touches the user in this
+    process; the TTL bounds staleness from writes in other workers.
+    """
+
+    def __init__(self):
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, user_id):
+        with self._lock:
+            entry = self._entries.get(user_id)
+            if entry is None:
+                return None
+            expires_at, snapshot = entry
+            if expires_at < time.monotonic():
+                del self._entries[user_id]
+                return None
+            self._entries.move_to_end(user_id)
+            return snapshot
+
+    def put(self, user_id, snapshot, ttl, max_size):
+        with self._lock:
+            self._entries[user_id] = (time.monotonic() + ttl, snapshot)
+            self._entries.move_to_end(user_id)
+            while len(self._entries) > max_size:
+                self._entries.popitem(last=False)
+
+    def evict(self, user_id):
+        with self._lock:
+            self._entries.pop(user_id, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+user_cache = UserCache()
+
+def _attach(snapshot):
+    """Put a cached user into the session without a SELECT"""
+    session = db.session()
+    existing = session.identity_map.get(identity_key(User, snapshot['id']))
+    if existing is not None:
+        return existing
+
+    user = User(**snapshot)
+    make_transient_to_detached(user)
+    session.add(user)
+    return user
+
+def load_user(user_id):
+    """Session-attached User for an id, served from the cache when possible"""
+    user_id = int(user_id)
+    snapshot = user_cache.get(user_id)
+    if snapshot is not None:
+        return _attach(snapshot)
+
+    user = db.session.get(User, user_id)
+    if user is not None:
+        _remember(user)
+    return user
+
+def _remember(user):
+    user_cache.put(
+        user.id,
+        {key: getattr(user, key) for key in USER_COLUMNS},
+        current_app.config['USER_CACHE_TTL'],
+        current_app.config['USER_CACHE_SIZE']
+    )
+
+def refresh_stale_user(user_id, data_version):
+    """Reload the request's user when its snapshot predates `data_version`.
+
+    Commits in other workers do not evict this worker's cache, so views whose
+    ETag comes from a fresh data_version call this before embedding the user.
+    """
+    user_id = int(user_id)
+    user = db.session().identity_map.get(identity_key(User, user_id))
+    snapshot = user_cache.get(user_id)
+    if user is not None and (user.data_version or 0) != data_version:
+        stale = True
+    else:
+        stale = snapshot is not None and (snapshot['data_version'] or 0) != data_version
+    if not stale:
+        return
+
+    user_cache.evict(user_id)
+    # Refreshes the instance flask-jwt-extended already handed out, in place
+    user = db.session.get(User, user_id, populate_existing=True)
+    if user is not None:
+        _remember(user)
+
+def evict_user(user_id, session=None):
+    """Evict a user after the current transaction commits (for Core UPDATEs)"""
+    session = session or db.session()
+    session.info.setdefault('evict_users', set()).add(int(user_id))
+
+def register_user_loader(jwt):
+    @jwt.user_lookup_loader
+    def user_lookup_callback(jwt_header, jwt_data):
+        return load_user(jwt_data['sub'])
+
+@event.listens_for(Session, 'after_flush')
+def _collect_user_evictions(session, flush_context):
+    for obj in list(session.dirty) + list(session.deleted):
+        if isinstance(obj, User) and obj.id is not None:
+            session.info.setdefault('evict_users', set()).add(obj.id)
+
+@event.listens_for(Session, 'after_commit')
+def _evict_committed_users(session):
+    for user_id in session.info.pop('evict_users', ()):
+        user_cache.evict(user_id)
+
+@event.listens_for(Session, 'after_rollback')
+def _discard_user_evictions(session):
+    session.info.pop('evict_users', None)
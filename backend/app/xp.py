@@ -0,0 +1,120 @@
+from datetime import datetime
+from sqlalchemy import case, func, insert, select, update
+from sqlalchemy.orm.util import identity_key
+from models import db, User, XpEvent
+from app.etag import mark_changed
+from app.user_loader import evict_user
+from app.streaks import record_activity, streak_values
+
+XP_PER_LEVEL = 100
+RECONCILE_CHUNK_SIZE = 1000
+
+users = User.__table__
+
+def level_for(total_xp):
+    """Level reached at a total XP; works on ints and SQL expressions"""
+    return total_xp // XP_PER_LEVEL + 1
+
+def _max(a, b):
+    # GREATEST() is Postgres-only; CASE works everywhere
+    return case((a > b, a), else_=b)
+
+COUNTER_COLUMNS = (
+    func.coalesce(users.c.tasks_completed, 0).label('tasks_completed'),
+    func.coalesce(users.c.streak, 0).label('streak'),
+    func.coalesce(users.c.level, 1).label('level'),
+    func.coalesce(users.c.planners_created, 0).label('planners_created'),
+    func.coalesce(users.c.total_xp, 0).label('total_xp')
+)
+
+def counters(user_id):
+    """Current values achievements are measured against, read from the database"""
+    return db.session.execute(
+        select(*COUNTER_COLUMNS).where(users.c.id == int(user_id))
+    ).one()._asdict()
+
+def award(user_id, events=(), tasks_completed=0, planners_created=0):
+    """Append XP events to the ledger and apply them with one atomic UPDATE.
+
+    `events` are (amount, reason, source_id) tuples. The increments run in
+    SQL, so concurrent awards never overwrite each other. Completed tasks
+    also count towards today's activity and streak. Returns counters() as
+    they are after the update.
+    """
+    user_id = int(user_id)
+    events = list(events)
+    amount = sum(e[0] for e in events)
+
+    if events:
+        now = datetime.utcnow()
+        db.session.execute(insert(XpEvent), [
+            {'user_id': user_id, 'amount': a, 'reason': reason, 'source_id': source_id, 'created_at': now}
+            for a, reason, source_id in events
+        ])
+
+    total_xp = func.coalesce(users.c.total_xp, 0) + amount
+    values = {
+        'xp': func.coalesce(users.c.xp, 0) + amount,
+        'total_xp': total_xp,
+        'level': _max(level_for(total_xp), func.coalesce(users.c.level, 1)),
+        'tasks_completed': func.coalesce(users.c.tasks_completed, 0) + tasks_completed,
+        'planners_created': func.coalesce(users.c.planners_created, 0) + planners_created
+    }
+    if tasks_completed:
+        record_activity(user_id, tasks_completed)
+        values.update(streak_values())
+
+    after = db.session.execute(
+        update(users).where(users.c.id == user_id).values(**values).returning(*COUNTER_COLUMNS)
+    ).one()._asdict()
+
+    # The UPDATE bypassed the unit of work: refresh, re-cache and re-tag
+    user = db.session.identity_map.get(identity_key(User, user_id))
+    if user is not None:
+        db.session.expire(user)
+    evict_user(user_id)
+    mark_changed(user_id)
+    return after
+
+def reconcile(chunk_size=RECONCILE_CHUNK_SIZE):
+    """Rebuild xp, total_xp and level from the ledger, one chunk of users per transaction.
+
+    Rows that already match are left alone. An award committing while its
+    chunk is being rewritten can be undercounted; the next run repairs it
+    because the ledger row exists. Returns the number of users corrected.
+    """
+    ledger_total = func.coalesce(
+        select(func.sum(XpEvent.amount)).where(XpEvent.user_id == users.c.id).scalar_subquery(),
+        0
+    )
+
+    fixed = 0
+    last_id = 0
+    while True:
+        ids = db.session.execute(
+            select(users.c.id).where(users.c.id > last_id).order_by(users.c.id).limit(chunk_size)
+        ).scalars().all()
+        if not ids:
+            return fixed
+
+        result = db.session.execute(
+            update(users)
+            .where(users.c.id.in_(ids))
+            .where(
+                (func.coalesce(users.c.total_xp, 0) != ledger_total)
+                | (func.coalesce(users.c.xp, 0) != ledger_total)
+                | (func.coalesce(users.c.level, 1) < level_for(ledger_total))
+            )
+            .values(
+                xp=ledger_total,
+                total_xp=ledger_total,
+                level=_max(level_for(ledger_total), func.coalesce(users.c.level, 1))
+            )
+            .returning(users.c.id)
+        )
+        for user_id in result.scalars():
+            evict_user(user_id)
+            mark_changed(user_id)
+            fixed += 1
+        db.session.commit()
+        last_id = ids[-1]
@@ -0,0 +1,38 @@
+"""
+Streak Backfill Script
+Rebuild the daily activity rollup and streaks from task history
+
+Usage: python backfill_streaks.py [--chunk-size 1000]
+"""
+
+import argparse
+import sys
+import os
+import time
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from app import create_app
+
+def main():
+    parser = argparse.ArgumentParser(description='Rebuild daily activity and streaks from completed tasks')
+    parser.add_argument('--chunk-size', type=int, default=1000, help='Users updated per transaction')
+    parser.add_argument('--config', default=os.getenv('FLASK_ENV', 'development'))
+    args = parser.parse_args()
+
+    from app.streaks import backfill
+
+    app = create_app(args.config)
+
+    with app.app_context():
+        start = time.perf_counter()
+        processed = backfill(chunk_size=args.chunk_size)
+        elapsed = time.perf_counter() - start
+
+        print("=" * 60)
+        print(f"✅ Backfilled streaks for {processed} users in {elapsed:.1f}s")
+        print("=" * 60)
+
+if __name__ == '__main__':
+    main()
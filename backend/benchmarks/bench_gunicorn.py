@@ -0,0 +1,167 @@
+"""
+Gunicorn mode benchmark
+Starts gunicorn with gunicorn.conf.py in each concurrency mode against a
+local SQLite database and drives it with keep-alive clients: mostly task
+list reads, some stats reads and a few bcrypt logins. Reports requests per
+second and p50/p99 latency per mode.
+
+    python benchmarks/bench_gunicorn.py [--modes sync,gthread,gevent] [--clients 16] [--seconds 10]
+
+The load generator runs on the same machine, so compare modes with each
+other rather than reading the numbers as absolute capacity.
+"""
+
+import argparse
+import http.client
+import json
+import os
+import random
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from datetime import datetime, timedelta
+
+BACKEND = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND)
+
+EMAIL = 'bench@planner.com'
+PASSWORD = 'bench-password'
+
+def seed(tasks):
+    """Bootstrapped SQLite file with one user and `tasks` tasks; returns a token"""
+    db_path = os.path.join(tempfile.mkdtemp(), 'bench.db')
+    os.environ['DATABASE_URL'] = f'sqlite:///{db_path}'
+
+    from app import create_app
+    from init_db import init_database
+    from models import db, User, Task
+    from flask_jwt_extended import create_access_token
+    import bcrypt
+
+    app = create_app(os.environ.get('FLASK_ENV', 'development'))
+    init_database(app)
+    with app.app_context():
+        rounds = app.config['BCRYPT_ROUNDS']
+        user = User(
+            email=EMAIL, username='bench',
+            password_hash=bcrypt.hashpw(PASSWORD.encode('utf-8'), bcrypt.gensalt(rounds=rounds)).decode('utf-8')
+        )
+        db.session.add(user)
+        db.session.commit()
+
+        now = datetime.utcnow()
+        db.session.execute(db.insert(Task), [{
+            'user_id': user.id,
+            'title': f'Task {i}',
+            'status': 'completed' if i % 3 == 0 else 'pending',
+            'priority': ('low', 'medium', 'high', 'urgent')[i % 4],
+            'created_at': now - timedelta(seconds=i),
+            'updated_at': now,
+            'xp_reward': 10
+        } for i in range(tasks)])
+        db.session.commit()
+        return create_access_token(identity=str(user.id))
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0))
+        return s.getsockname()[1]
+
+def start_server(mode, port):
+    env = dict(os.environ, GUNICORN_MODE=mode, PORT=str(port), GUNICORN_ACCESS_LOG=os.devnull)
+    server = subprocess.Popen(
+        [sys.executable, '-m', 'gunicorn', '-c', 'gunicorn.conf.py', 'run:app'],
+        cwd=BACKEND, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+    )
+    deadline = time.time() + 30
+    while time.time() < deadline:
+        try:
+            conn = http.client.HTTPConnection('127.0.0.1', port, timeout=1)
+            conn.request('GET', '/api/health')
+            if conn.getresponse().status == 200:
+                return server
+        except OSError:
+            time.sleep(0.2)
+    server.kill()
+    raise RuntimeError(f'gunicorn ({mode}) did not start')
+
+def client(port, token, stop, timings, errors, rng):
+    auth = {'Authorization': f'Bearer {token}'}
+    login = json.dumps({'email': EMAIL, 'password': PASSWORD})
+    conn = http.client.HTTPConnection('127.0.0.1', port, timeout=30)
+    while not stop.is_set():
+        roll = rng.random()
+        if roll < 0.02:
+            args = ('POST', '/api/auth/login', login, {'Content-Type': 'application/json'})
+        elif roll < 0.10:
+            args = ('GET', '/api/user/stats', None, auth)
+        else:
+            args = ('GET', '/api/tasks?limit=50', None, auth)
+
+        start = time.perf_counter()
+        try:
+            conn.request(*args)
+            response = conn.getresponse()
+            response.read()
+            if response.status >= 400:
+                errors.append(response.status)
+        except (OSError, http.client.HTTPException):
+            errors.append('connection')
+            conn.close()
+            conn = http.client.HTTPConnection('127.0.0.1', port, timeout=30)
+            continue
+        timings.append(time.perf_counter() - start)
+
+def run_load(port, token, clients, seconds):
+    stop = threading.Event()
+    timings, errors = [], []
+    threads = [
+        threading.Thread(target=client, args=(port, token, stop, timings, errors, random.Random(i)))
+        for i in range(clients)
+    ]
+    for t in threads:
+        t.start()
+    time.sleep(seconds)
+    stop.set()
+    for t in threads:
+        t.join()
+    return sorted(timings), errors
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--modes', default='sync,gthread,gevent')
+    parser.add_argument('--clients', type=int, default=16)
+    parser.add_argument('--seconds', type=int, default=10)
+    parser.add_argument('--tasks', type=int, default=500)
+    args = parser.parse_args()
+
+    token = seed(args.tasks)
+
+    print(f"clients={args.clients} seconds={args.seconds} cpus={os.cpu_count()}")
+    print(f"{'mode':<10}{'req/s':>10}{'p50 ms':>10}{'p99 ms':>10}{'errors':>10}")
+    for mode in args.modes.split(','):
+        if mode == 'gevent':
+            try:
+                import gevent  # noqa: F401
+            except ImportError:
+                print(f"{mode:<10}{'skipped (gevent not installed)':>40}")
+                continue
+
+        port = free_port()
+        server = start_server(mode, port)
+        try:
+            run_load(port, token, args.clients, 1)  # warm up
+            timings, errors = run_load(port, token, args.clients, args.seconds)
+        finally:
+            server.terminate()
+            server.wait()
+
+        p50 = timings[len(timings) // 2] * 1000
+        p99 = timings[min(len(timings) - 1, int(len(timings) * 0.99))] * 1000
+        print(f"{mode:<10}{len(timings) / args.seconds:>10.0f}{p50:>10.1f}{p99:>10.1f}{len(errors):>10}")
+
+if __name__ == '__main__':
+    main()
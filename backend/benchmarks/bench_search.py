@@ -0,0 +1,108 @@
+"""
+Search benchmark
+Loads N tasks spread over many users, then measures /api/search query
+latency (p50/p95/max) for one- and two-term prefix queries.
+
+    python benchmarks/bench_search.py [--tasks 1000000] [--users 1000] [--queries 200]
+
+Runs against DATABASE_URL when set (Postgres: tsvector + GIN), otherwise
+a temporary SQLite file (FTS5).
+"""
+
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+WORDS = (
+    'comprar pintar relatorio reuniao enviar revisar casa obra trabalho mercado '
+    'academia estudar ler livro projeto cliente fatura pagar conta viagem '
+    'planejar agenda email ligar medico consulta limpar cozinha jardim carro'
+).split()
+TAGS = ('work', 'home', 'health', 'finance', 'study', 'travel')
+
+def build_app(tasks, users, chunk=20000):
+    if not os.environ.get('DATABASE_URL'):
+        db_path = os.path.join(tempfile.mkdtemp(), 'bench.db')
+        os.environ['DATABASE_URL'] = f'sqlite:///{db_path}'
+
+    from app import create_app
+    from init_db import init_database
+    from models import db, User, Task
+
+    app = create_app('development')
+    init_database(app)
+    rng = random.Random(42)
+    with app.app_context():
+        first = db.session.execute(db.select(db.func.max(User.id))).scalar() or 0
+        db.session.execute(db.insert(User), [
+            {'email': f'bench{first + i}@planner.com', 'username': f'bench{i}', 'password_hash': 'x'}
+            for i in range(users)
+        ])
+        user_ids = db.session.execute(db.select(User.id).where(User.id > first)).scalars().all()
+
+        now = datetime.utcnow()
+        start = time.perf_counter()
+        for offset in range(0, tasks, chunk):
+            db.session.execute(db.insert(Task), [{
+                'user_id': user_ids[i % len(user_ids)],
+                'title': ' '.join(rng.sample(WORDS, 3)),
+                'description': ' '.join(rng.sample(WORDS, 8)),
+                'status': 'pending',
+                'priority': 'medium',
+                'created_at': now,
+                'updated_at': now,
+                'xp_reward': 10,
+                'tags': ','.join(rng.sample(TAGS, 2))
+            } for i in range(offset, min(offset + chunk, tasks))])
+            db.session.commit()
+        print(f"loaded {tasks} tasks for {users} users in {time.perf_counter() - start:.1f}s")
+        return app, user_ids
+
+def percentile(values, pct):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * pct))]
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--tasks', type=int, default=1000000)
+    parser.add_argument('--users', type=int, default=1000)
+    parser.add_argument('--queries', type=int, default=200)
+    args = parser.parse_args()
+
+    app, user_ids = build_app(args.tasks, args.users)
+
+    from models import db, Task
+    from app.search import search, search_terms
+    from app.serializers import TASK_COLUMNS
+
+    rng = random.Random(7)
+    cases = {
+        'one prefix': lambda: rng.choice(WORDS)[:3],
+        'two words': lambda: ' '.join(rng.sample(WORDS, 2)),
+        'word + tag': lambda: f'{rng.choice(WORDS)} {rng.choice(TAGS)}',
+    }
+
+    print(f"backend={os.environ['DATABASE_URL'].split(':')[0]} tasks={args.tasks} users={args.users}")
+    print(f"{'query':<12}{'p50 ms':>10}{'p95 ms':>10}{'max ms':>10}{'avg hits':>10}")
+    for name, make_query in cases.items():
+        timings, hits = [], 0
+        with app.app_context():
+            for _ in range(args.queries):
+                terms = search_terms(make_query())
+                user_id = rng.choice(user_ids)
+                start = time.perf_counter()
+                rows = search('tasks', Task, TASK_COLUMNS, user_id, terms, 20)
+                timings.append(time.perf_counter() - start)
+                hits += len(rows)
+            db.session.remove()
+        print(f"{name:<12}{percentile(timings, 0.5) * 1000:>10.2f}{percentile(timings, 0.95) * 1000:>10.2f}"
+              f"{max(timings) * 1000:>10.2f}{hits / args.queries:>10.1f}")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,103 @@
+"""
+Serializer benchmark
+Compares the ORM + to_dict() list path with the Core select() + RowSerializer
+path for 10k tasks: throughput and allocations per run.
+
+    python benchmarks/bench_serializers.py [--rows 10000] [--repeat 5]
+"""
+
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+def build_app(rows):
+    db_path = os.path.join(tempfile.mkdtemp(), 'bench.db')
+    os.environ['DATABASE_URL'] = f'sqlite:///{db_path}'
+
+    from app import create_app
+    from init_db import init_database
+    from models import db, User, Task
+
+    app = create_app('development')
+    init_database(app)
+    with app.app_context():
+        user = User(email='bench@planner.com', username='bench', password_hash='x')
+        db.session.add(user)
+        db.session.commit()
+
+        now = datetime.utcnow()
+        db.session.execute(db.insert(Task), [{
+            'user_id': user.id,
+            'title': f'Task {i}',
+            'description': 'Benchmark task description',
+            'status': 'completed' if i % 3 == 0 else 'pending',
+            'priority': ('low', 'medium', 'high', 'urgent')[i % 4],
+            'due_date': now + timedelta(days=i % 30),
+            'completed_at': now if i % 3 == 0 else None,
+            'created_at': now - timedelta(seconds=i),
+            'updated_at': now,
+            'xp_reward': 10,
+            'tags': 'work,home' if i % 2 else None
+        } for i in range(rows)])
+        db.session.commit()
+        return app, user.id
+
+def orm_path(user_id):
+    from models import Task
+    tasks = Task.query.filter_by(user_id=user_id).order_by(Task.created_at.desc()).all()
+    return json.dumps([t.to_dict() for t in tasks]).encode('utf-8')
+
+def core_path(user_id):
+    from models import db, Task
+    from app.serializers import TASK_COLUMNS, task_serializer, dumps
+    rows = db.session.execute(
+        db.select(*TASK_COLUMNS).where(Task.user_id == user_id).order_by(Task.created_at.desc())
+    ).all()
+    return dumps(task_serializer.to_dicts(rows))
+
+def measure(app, fn, user_id, repeat):
+    from models import db
+
+    timings = []
+    for _ in range(repeat):
+        with app.app_context():
+            start = time.perf_counter()
+            fn(user_id)
+            timings.append(time.perf_counter() - start)
+            db.session.remove()
+
+    with app.app_context():
+        tracemalloc.start()
+        fn(user_id)
+        snapshot = tracemalloc.take_snapshot()
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        db.session.remove()
+
+    blocks = sum(stat.count for stat in snapshot.statistics('filename'))
+    return min(timings), peak, blocks
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--rows', type=int, default=10000)
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    app, user_id = build_app(args.rows)
+
+    from app.serializers import orjson
+    print(f"rows={args.rows} repeat={args.repeat} encoder={'orjson' if orjson else 'stdlib json'}")
+    print(f"{'path':<12}{'best ms':>10}{'rows/s':>12}{'peak KiB':>12}{'live blocks':>14}")
+    for name, fn in (('orm+to_dict', orm_path), ('core+fast', core_path)):
+        best, peak, blocks = measure(app, fn, user_id, args.repeat)
+        print(f"{name:<12}{best * 1000:>10.1f}{args.rows / best:>12.0f}{peak / 1024:>12.0f}{blocks:>14}")
+
+if __name__ == '__main__':
+    main()
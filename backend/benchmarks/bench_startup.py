@@ -0,0 +1,80 @@
+"""
+Startup benchmark
+Cold-starts a fresh interpreter the way a gunicorn worker does (import
+run.py) and reports import time, time to the first response and time to
+the first database-backed response. Compares the current lazy startup
+with running the bootstrap inside every worker, as run.py used to, on an
+already bootstrapped database and on an empty one (first boot after a
+deploy: migrations plus the admin bcrypt hash).
+
+    python benchmarks/bench_startup.py [--runs 5]
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+BACKEND = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+CHILD = r'''
+import json, sys, time
+start = time.perf_counter()
+sys.path.insert(0, {backend!r})
+import run
+imported = time.perf_counter()
+if {inline!r}:
+    from init_db import init_database
+    init_database(run.app)
+client = run.app.test_client()
+client.get('/api/health')
+first = time.perf_counter()
+client.post('/api/auth/login', json={{'email': 'nobody@planner.com', 'password': 'x'}})
+first_db = time.perf_counter()
+print(json.dumps({{'import': imported - start, 'first': first - start, 'first_db': first_db - start}}))
+'''
+
+def cold_start(inline, database_url):
+    started = time.perf_counter()
+    out = subprocess.run(
+        [sys.executable, '-c', CHILD.format(backend=BACKEND, inline=inline)],
+        capture_output=True, text=True, check=True, env=dict(os.environ, DATABASE_URL=database_url)
+    ).stdout
+    result = json.loads(out.strip().splitlines()[-1])
+    result['process'] = time.perf_counter() - started
+    return result
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--runs', type=int, default=5)
+    args = parser.parse_args()
+
+    db_path = os.path.join(tempfile.mkdtemp(), 'bench.db')
+    os.environ['DATABASE_URL'] = f'sqlite:///{db_path}'
+    os.environ.setdefault('FLASK_ENV', 'production')
+
+    # Bootstrap once, as the deploy step would
+    subprocess.run(
+        [sys.executable, '-m', 'flask', '--app', 'run', 'bootstrap'],
+        cwd=BACKEND, capture_output=True, check=True, env=os.environ
+    )
+
+    print(f"runs={args.runs} (median, ms; times are from interpreter start except 'process')")
+    print(f"{'startup':<18}{'import':>10}{'first':>10}{'first db':>10}{'process':>10}")
+    fresh = lambda: f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'fresh.db')}"
+    scenarios = (
+        ('lazy', False, lambda: os.environ['DATABASE_URL']),
+        ('inline', True, lambda: os.environ['DATABASE_URL']),
+        ('inline, empty db', True, fresh),
+    )
+    for name, inline, database_url in scenarios:
+        runs = [cold_start(inline, database_url()) for _ in range(args.runs)]
+        median = {k: statistics.median(r[k] for r in runs) * 1000 for k in runs[0]}
+        print(f"{name:<18}{median['import']:>10.0f}{median['first']:>10.0f}{median['first_db']:>10.0f}{median['process']:>10.0f}")
+
+if __name__ == '__main__':
+    main()
@@ -1,6 +1,29 @@
 import os
 from datetime import timedelta
 
+def engine_options(uri, pool_size, max_overflow, pool_timeout, pool_recycle):
+    """SQLALCHEMY_ENGINE_OPTIONS for a database URI.
+
+    Arguments are the config class defaults; DB_* environment variables
+    override them. In-memory SQLite keeps SQLAlchemy's single-connection pool.
+    """
+    if uri.startswith('sqlite') and (':memory:' in uri or uri.rstrip('/') == 'sqlite:'):
+        return {}
+
+    options = {
+        'pool_size': int(os.environ.get('DB_POOL_SIZE', pool_size)),
+        'max_overflow': int(os.environ.get('DB_MAX_OVERFLOW', max_overflow)),
+        'pool_timeout': int(os.environ.get('DB_POOL_TIMEOUT', pool_timeout)),
+        # Reconnect before the server (or Render's proxy) drops idle connections
+        'pool_recycle': int(os.environ.get('DB_POOL_RECYCLE', pool_recycle)),
+        'pool_pre_ping': os.environ.get('DB_POOL_PRE_PING', 'true').lower() == 'true',
+    }
+    if uri.startswith(('postgresql', 'postgres')):
+        # Batch executemany UPDATE/DELETE (INSERTs already use multi-row VALUES)
+        options['executemany_mode'] = os.environ.get('DB_EXECUTEMANY_MODE', 'values_plus_batch')
+        options['executemany_batch_page_size'] = int(os.environ.get('DB_EXECUTEMANY_PAGE_SIZE', 500))
+    return options
+
 class Config:
     """Base configuration"""
     SECRET_KEY = os.environ.get('SECRET_KEY') or 'dev-secret-key-change-in-production'
@@ -8,11 +31,48 @@ class Config:
     JWT_SECRET_KEY = os.environ.get('JWT_SECRET_KEY') or 'jwt-secret-key-change'
     JWT_ACCESS_TOKEN_EXPIRES = timedelta(days=7)
     JWT_REFRESH_TOKEN_EXPIRES = timedelta(days=30)
+    # Serve /api/user/stats from the user_stats table instead of aggregating tasks
+    MATERIALIZED_STATS = os.environ.get('MATERIALIZED_STATS', 'false').lower() == 'true'
+    # Seconds an in-process leaderboard snapshot is served before refreshing
+    LEADERBOARD_TTL = int(os.environ.get('LEADERBOARD_TTL', 30))
+    # Seconds a worker keeps its achievement catalog; changes committed by
+    # other workers show up within this window
+    CATALOG_TTL = int(os.environ.get('CATALOG_TTL', 60))
+
+    # bcrypt work factor; hashes with a different cost are upgraded on login
+    BCRYPT_ROUNDS = int(os.environ.get('BCRYPT_ROUNDS', 12))
+    # Threads hashing per process, extra requests allowed to wait, and the wait limit
+    BCRYPT_WORKERS = int(os.environ.get('BCRYPT_WORKERS', 2))
+    BCRYPT_QUEUE_DEPTH = int(os.environ.get('BCRYPT_QUEUE_DEPTH', 8))
+    BCRYPT_TIMEOUT = float(os.environ.get('BCRYPT_TIMEOUT', 10))
+
+    # Per-process cache of authenticated user rows (entries, seconds)
+    USER_CACHE_SIZE = int(os.environ.get('USER_CACHE_SIZE', 1024))
+    USER_CACHE_TTL = int(os.environ.get('USER_CACHE_TTL', 30))
+
+    # SQLite fallback: pragmas for every new connection (see app/sqlite.py)
+    SQLITE_PRAGMAS = {
+        'journal_mode': os.environ.get('SQLITE_JOURNAL_MODE', 'WAL'),
+        'synchronous': os.environ.get('SQLITE_SYNCHRONOUS', 'NORMAL'),
+        'busy_timeout': int(os.environ.get('SQLITE_BUSY_TIMEOUT', 5000)),
+        'cache_size': -int(os.environ.get('SQLITE_CACHE_KB', 20000)),
+        'mmap_size': int(os.environ.get('SQLITE_MMAP_SIZE', 128 * 1024 * 1024)),
+        'temp_store': 'MEMORY',
+    }
+
+    # /metrics and /api/metrics/* require an X-Metrics-Token header with this value;
+    # unset, they are only served in development and testing
+    METRICS_TOKEN = os.environ.get('METRICS_TOKEN')
+    # Log requests slower than this (ms) with the SQL they ran; unset disables the log
+    SLOW_REQUEST_MS = int(os.environ['SLOW_REQUEST_MS']) if os.environ.get('SLOW_REQUEST_MS') else None
 
 class Development(Config):
     """Development configuration"""
     DEBUG = True
     SQLALCHEMY_DATABASE_URI = os.environ.get('DATABASE_URL') or 'sqlite:///planner.db'
+    SQLALCHEMY_ENGINE_OPTIONS = engine_options(
+        SQLALCHEMY_DATABASE_URI, pool_size=5, max_overflow=5, pool_timeout=10, pool_recycle=1800
+    )
 
 class Production(Config):
     """Production configuration for Render"""
@@ -23,9 +83,24 @@ class Production(Config):
         SQLALCHEMY_DATABASE_URI = db_url.replace('postgres://', 'postgresql://')
     else:
         SQLALCHEMY_DATABASE_URI = 'sqlite:///planner.db'
+    # Sized for gunicorn gthread workers (4 threads each); Render's Postgres
+    # closes idle connections, hence the short recycle
+    SQLALCHEMY_ENGINE_OPTIONS = engine_options(
+        SQLALCHEMY_DATABASE_URI, pool_size=5, max_overflow=10, pool_timeout=10, pool_recycle=280
+    )
+
+class Testing(Config):
+    """Test configuration: every app gets its own in-memory database"""
+    TESTING = True
+    SQLALCHEMY_DATABASE_URI = os.environ.get('TEST_DATABASE_URL') or 'sqlite://'
+    SQLALCHEMY_ENGINE_OPTIONS = engine_options(
+        SQLALCHEMY_DATABASE_URI, pool_size=5, max_overflow=5, pool_timeout=10, pool_recycle=1800
+    )
+    BCRYPT_ROUNDS = 4
 
 config = {
     'development': Development,
     'production': Production,
+    'testing': Testing,
     'default': Development
 }
@@ -0,0 +1,109 @@
+"""
+Gunicorn configuration
+Worker count, threads and timeouts are derived from the CPU count and can be
+overridden with environment variables:
+
+    GUNICORN_MODE                  gthread (default), gevent or sync
+    WEB_CONCURRENCY                worker processes (default: 2 x CPUs + 1, capped)
+    GUNICORN_MAX_WORKERS           cap for the computed worker count (default 4)
+    GUNICORN_THREADS               threads per gthread worker (default 4)
+    GUNICORN_WORKER_CONNECTIONS    greenlets per gevent worker (default 100)
+    GUNICORN_TIMEOUT               seconds before a silent worker is killed (default 30)
+    GUNICORN_KEEPALIVE             keep-alive seconds (default 5)
+    GUNICORN_MAX_REQUESTS          requests before a worker is recycled (default 1000, 0 = never)
+    GUNICORN_MAX_REQUESTS_JITTER   random extra requests so workers do not recycle together (default 100)
+    GUNICORN_PRELOAD               load the app in the master before forking (default true)
+
+Usage: flask --app run bootstrap && gunicorn -c gunicorn.conf.py run:app
+
+Gunicorn refuses to start while migrations are pending, so a start command
+that skips `flask bootstrap` fails loudly instead of serving a stale schema.
+"""
+
+import multiprocessing
+import os
+import sys
+
+def _env_int(name, default):
+    return int(os.environ.get(name, default))
+
+mode = os.environ.get('GUNICORN_MODE', 'gthread').lower()
+if mode not in ('gthread', 'gevent', 'sync'):
+    raise RuntimeError(f'GUNICORN_MODE must be gthread, gevent or sync, not {mode}')
+
+if mode == 'gevent':
+    # Patch before the app (and its locks, sockets and drivers) is imported
+    from gevent import monkey
+    monkey.patch_all()
+    try:
+        from psycogreen.gevent import patch_psycopg
+        patch_psycopg()
+    except ImportError:
+        pass
+
+cpus = multiprocessing.cpu_count()
+
+bind = f"0.0.0.0:{os.environ.get('PORT', '5000')}"
+worker_class = mode
+workers = _env_int('WEB_CONCURRENCY', min(cpus * 2 + 1, _env_int('GUNICORN_MAX_WORKERS', 4)))
+if mode == 'gthread':
+    threads = _env_int('GUNICORN_THREADS', 4)
+if mode == 'gevent':
+    worker_connections = _env_int('GUNICORN_WORKER_CONNECTIONS', 100)
+
+timeout = _env_int('GUNICORN_TIMEOUT', 30)
+graceful_timeout = _env_int('GUNICORN_GRACEFUL_TIMEOUT', 30)
+keepalive = _env_int('GUNICORN_KEEPALIVE', 5)
+
+# Recycle workers to cap slow memory growth; jitter avoids a synchronized restart
+max_requests = _env_int('GUNICORN_MAX_REQUESTS', 1000)
+max_requests_jitter = _env_int('GUNICORN_MAX_REQUESTS_JITTER', 100)
+
+# Import the app once in the master; workers share its memory copy-on-write
+preload_app = os.environ.get('GUNICORN_PRELOAD', 'true').lower() in ('1', 'true', 'yes')
+
+# Heartbeat files on tmpfs: a slow disk must not get workers killed
+if os.path.isdir('/dev/shm'):
+    worker_tmp_dir = '/dev/shm'
+
+accesslog = os.environ.get('GUNICORN_ACCESS_LOG', '-')
+errorlog = '-'
+loglevel = os.environ.get('GUNICORN_LOG_LEVEL', 'info')
+
+def on_starting(server):
+    """Refuse to boot on a database `flask bootstrap` has not migrated"""
+    from run import app
+    from models import db
+    from migrations import pending_migrations
+
+    with app.app_context():
+        pending = [version for version, _ in pending_migrations(db.engine)]
+        # Workers (or the preloaded master's forks) open their own connections
+        db.engine.dispose()
+
+    if pending:
+        server.log.error(
+            "Database has pending migrations: %s. Run `flask --app run bootstrap` "
+            "before starting gunicorn.", ', '.join(pending)
+        )
+        sys.exit(1)
+
+def post_fork(server, worker):
+    """Give each worker its own connections instead of the master's pool"""
+    if not preload_app:
+        return
+
+    from run import app
+    from models import db
+
+    with app.app_context():
+        # close=False: leave the parent's sockets alone, just forget them here
+        db.engine.dispose(close=False)
+
+def when_ready(server):
+    server.log.info(
+        f"Mode {mode}: {workers} workers"
+        + (f" x {threads} threads" if mode == 'gthread' else '')
+        + (f" x {worker_connections} connections" if mode == 'gevent' else '')
+        + f", preload={preload_app}, max_requests={max_requests}+{max_requests_jitter}"
+    )
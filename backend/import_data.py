@@ -0,0 +1,62 @@
+"""
+Bulk Import Script
+Import tasks and planners for a user from a CSV or NDJSON file
+
+Usage: python import_data.py user@example.com tasks.csv [--format csv|ndjson]
+"""
+
+import argparse
+import io
+import sys
+import os
+import time
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from app import create_app
+from models import User
+
+def main():
+    parser = argparse.ArgumentParser(description='Import tasks and planners from CSV or NDJSON')
+    parser.add_argument('email', help='Email of the user that will own the imported rows')
+    parser.add_argument('path', help='CSV or NDJSON file (use - for stdin)')
+    parser.add_argument('--format', choices=['csv', 'ndjson'], help='Defaults to the file extension')
+    parser.add_argument('--config', default=os.getenv('FLASK_ENV', 'development'))
+    args = parser.parse_args()
+
+    from app.importer import import_stream, detect_format
+
+    fmt = args.format or detect_format(args.path, None)
+    if not fmt:
+        print("❌ Could not detect the format, pass --format csv or --format ndjson")
+        sys.exit(1)
+
+    app = create_app(args.config)
+
+    with app.app_context():
+        user = User.query.filter_by(email=args.email.lower().strip()).first()
+        if not user:
+            print(f"❌ No user with email {args.email}")
+            sys.exit(1)
+
+        if args.path == '-':
+            stream = io.TextIOWrapper(sys.stdin.buffer, encoding='utf-8-sig', newline='')
+        else:
+            stream = open(args.path, encoding='utf-8-sig', newline='')
+
+        start = time.perf_counter()
+        with stream:
+            report = import_stream(user.id, stream, fmt)
+        elapsed = time.perf_counter() - start
+
+        print("=" * 60)
+        print(f"✅ Imported {report['tasks_created']} tasks and {report['planners_created']} planners in {elapsed:.1f}s")
+        if report['error_count']:
+            print(f"⚠️  {report['error_count']} rows were skipped:")
+            for error in report['errors'][:20]:
+                print(f"   line {error['line']}: {error['error']}")
+        print("=" * 60)
+
+if __name__ == '__main__':
+    main()
@@ -1,74 +1,61 @@
 """
-Auto-initialization script for database
-Creates admin user automatically on first run
-This is called by run.py on startup
+Database bootstrap
+Applies migrations, seeds default achievements and creates the admin user.
+Idempotent; run once per deploy with `flask --app run bootstrap`
+(`python run.py` also runs it for local development).
 """
 
 import os
 import sys
 
 def migrate_database(app):
-    """Add missing columns to existing database"""
-    from models import db
-    from sqlalchemy import inspect, text
+    """Apply pending versioned migrations (see migrations.py)"""
+    from migrations import run_migrations
 
     with app.app_context():
-        inspector = inspect(db.engine)
-        columns = [col['name'] for col in inspector.get_columns('users')]
+        run_migrations()
 
-        # Add planners_created column if it doesn't exist
-        if 'planners_created' not in columns:
-            print("🔧 Adding planners_created column to users table...")
-            try:
-                db.session.execute(text("ALTER TABLE users ADD COLUMN planners_created INTEGER DEFAULT 0"))
-                db.session.commit()
-                print("✅ Added planners_created column")
-            except Exception as e:
-                print(f"❌ Error adding planners_created column: {e}")
-                db.session.rollback()
+def create_admin():
+    """Create the admin user unless it exists; returns True when it was created.
+    Needs an app context and a migrated database."""
+    from models import db, User, XpEvent
+    from app.passwords import hash_password
 
-def init_database(app):
-    """Initialize database and create admin user"""
-    from models import db, User
-    import bcrypt
+    if User.query.filter_by(email='admin@planner.com').first():
+        return False
 
-    with app.app_context():
-        # First, run any needed migrations
-        try:
-            migrate_database(app)
-        except Exception as e:
-            print(f"⚠️ Migration warning: {e}")
+    admin_user = User(
+        email='admin@planner.com',
+        username='admin',
+        password_hash=hash_password('admin123'),
+        level=99,
+        xp=9999,
+        total_xp=9999,
+        streak=365,
+        tasks_completed=1000,
+        planners_created=5
+    )
 
-        # Create all tables (this won't change existing tables)
-        db.create_all()
+    db.session.add(admin_user)
+    db.session.flush()
 
-        # Check if admin exists
-        try:
-            admin = User.query.filter_by(email='admin@planner.com').first()
-        except Exception as e:
-            # If query fails, try to recreate admin
-            print(f"⚠️ Query failed: {e}")
-            admin = None
-
-        if not admin:
-            print("🔧 Creating admin user...")
-            password_hash = bcrypt.hashpw('admin123'.encode('utf-8'), bcrypt.gensalt()).decode('utf-8')
+    # Seed the XP ledger so reconcile keeps the admin's total
+    db.session.add(XpEvent(user_id=admin_user.id, amount=9999, reason='opening_balance'))
+    db.session.commit()
+    return True
 
-            admin_user = User(
-                email='admin@planner.com',
-                username='admin',
-                password_hash=password_hash,
-                level=99,
-                xp=9999,
-                total_xp=9999,
-                streak=365,
-                tasks_completed=1000,
-                planners_created=5
-            )
+def init_database(app):
+    """Initialize database and create admin user"""
+    from models import User
+    from app.achievements import init_achievements
 
-            db.session.add(admin_user)
-            db.session.commit()
+    with app.app_context():
+        # First, run any needed migrations (creates missing tables too).
+        # Failures propagate so a broken deploy stops here.
+        migrate_database(app)
+        init_achievements()
 
+        if create_admin():
             print("=" * 60)
             print("✅ ADMIN USER CREATED!")
             print("=" * 60)
@@ -0,0 +1,230 @@
+"""
+Versioned schema migrations
+Each migration runs once, in order, and is recorded in schema_migrations.
+An advisory lock makes sure only one gunicorn worker applies them.
+"""
+
+import os
+import hashlib
+import tempfile
+from contextlib import contextmanager
+from datetime import datetime
+from sqlalchemy import MetaData, Table, Column, String, DateTime, inspect, select, text
+from models import db, UserStats, DeletedRecord, XpEvent, DailyActivity, Tag, TaskTag
+
+# Arbitrary key shared by every worker for pg_advisory_lock
+MIGRATION_LOCK_KEY = 74616101
+
+migration_metadata = MetaData()
+
+schema_migrations = Table(
+    'schema_migrations', migration_metadata,
+    Column('version', String(100), primary_key=True),
+    Column('applied_at', DateTime, default=datetime.utcnow)
+)
+
+MIGRATIONS = []
+
+def migration(version):
+    """Register a migration function under a version string (applied in order)"""
+    def register(fn):
+        MIGRATIONS.append((version, fn))
+        return fn
+    return register
+
+@migration('0001_initial_schema')
+def initial_schema(conn):
+    """Create every table the models describe (no-op for existing tables)"""
+    db.metadata.create_all(bind=conn)
+
+@migration('0002_users_planners_created')
+def users_planners_created(conn):
+    """Add planners_created to databases created before the column existed"""
+    columns = [col['name'] for col in inspect(conn).get_columns('users')]
+    if 'planners_created' not in columns:
+        conn.execute(text("ALTER TABLE users ADD COLUMN planners_created INTEGER DEFAULT 0"))
+
+@migration('0003_pagination_indexes')
+def pagination_indexes(conn):
+    """Composite indexes backing keyset pagination on tasks and planners"""
+    conn.execute(text("CREATE INDEX IF NOT EXISTS ix_tasks_user_created ON tasks (user_id, created_at, id)"))
+    conn.execute(text("CREATE INDEX IF NOT EXISTS ix_planners_user_created ON planners (user_id, created_at, id)"))
+
+@migration('0004_hot_query_indexes')
+def hot_query_indexes(conn):
+    """Indexes for the per-user task filters and achievement lookups"""
+    conn.execute(text("CREATE INDEX IF NOT EXISTS ix_tasks_user_status ON tasks (user_id, status)"))
+    conn.execute(text("CREATE INDEX IF NOT EXISTS ix_tasks_user_planner ON tasks (user_id, planner_id)"))
+    conn.execute(text("CREATE INDEX IF NOT EXISTS ix_tasks_user_completed ON tasks (user_id, completed_at)"))
+    conn.execute(text("CREATE INDEX IF NOT EXISTS ix_tasks_user_due ON tasks (user_id, due_date)"))
+
+    # Drop duplicate unlocks before enforcing uniqueness
+    conn.execute(text(
+        "DELETE FROM user_achievements WHERE id NOT IN ("
+        "SELECT MIN(id) FROM user_achievements GROUP BY user_id, achievement_id)"
+    ))
+    conn.execute(text(
+        "CREATE UNIQUE INDEX IF NOT EXISTS ux_user_achievements_user_achievement "
+        "ON user_achievements (user_id, achievement_id)"
+    ))
+
+@migration('0005_user_stats')
+def user_stats_table(conn):
+    """Materialized per-user counters (rows are built lazily on first read)"""
+    UserStats.__table__.create(bind=conn, checkfirst=True)
+
+@migration('0006_leaderboard_indexes')
+def leaderboard_indexes(conn):
+    """Ordered XP index for ranks and a completed_at index for windowed boards"""
+    conn.execute(text("CREATE INDEX IF NOT EXISTS ix_users_total_xp ON users (total_xp, id)"))
+    conn.execute(text("CREATE INDEX IF NOT EXISTS ix_tasks_completed_at ON tasks (completed_at)"))
+
+@migration('0007_subtasks_task_index')
+def subtasks_task_index(conn):
+    """Index for loading subtasks of a page of tasks with one IN query"""
+    conn.execute(text('CREATE INDEX IF NOT EXISTS ix_subtasks_task_order ON subtasks (task_id, "order")'))
+
+@migration('0008_users_data_version')
+def users_data_version(conn):
+    """Per-user change counter used for ETags"""
+    columns = [col['name'] for col in inspect(conn).get_columns('users')]
+    if 'data_version' not in columns:
+        conn.execute(text("ALTER TABLE users ADD COLUMN data_version INTEGER NOT NULL DEFAULT 0"))
+
+@migration('0009_sync_tombstones')
+def sync_tombstones(conn):
+    """Tombstones plus updated_at indexes for delta sync"""
+    DeletedRecord.__table__.create(bind=conn, checkfirst=True)
+
+    columns = [col['name'] for col in inspect(conn).get_columns('subtasks')]
+    if 'updated_at' not in columns:
+        conn.execute(text("ALTER TABLE subtasks ADD COLUMN updated_at TIMESTAMP"))
+
+    conn.execute(text("CREATE INDEX IF NOT EXISTS ix_tasks_user_updated ON tasks (user_id, updated_at)"))
+    conn.execute(text("CREATE INDEX IF NOT EXISTS ix_planners_user_updated ON planners (user_id, updated_at)"))
+
+@migration('0010_xp_events')
+def xp_events(conn):
+    """XP ledger, seeded with each user's current total as an opening balance"""
+    XpEvent.__table__.create(bind=conn, checkfirst=True)
+    conn.execute(text(
+        "INSERT INTO xp_events (user_id, amount, reason, created_at) "
+        "SELECT id, total_xp, 'opening_balance', CURRENT_TIMESTAMP FROM users "
+        "WHERE total_xp IS NOT NULL AND total_xp <> 0"
+    ))
+
+@migration('0011_daily_activity')
+def daily_activity(conn):
+    """Per-day completion rollup and streak bookkeeping on users.
+    Existing history is loaded by backfill_streaks.py."""
+    DailyActivity.__table__.create(bind=conn, checkfirst=True)
+
+    columns = [col['name'] for col in inspect(conn).get_columns('users')]
+    if 'longest_streak' not in columns:
+        conn.execute(text("ALTER TABLE users ADD COLUMN longest_streak INTEGER DEFAULT 0"))
+    if 'last_active_on' not in columns:
+        conn.execute(text("ALTER TABLE users ADD COLUMN last_active_on DATE"))
+
+@migration('0012_task_tags')
+def task_tags(conn):
+    """Normalized tag index, built from the comma-joined tasks.tags column"""
+    from app.tags import split_tags
+
+    Tag.__table__.create(bind=conn, checkfirst=True)
+    TaskTag.__table__.create(bind=conn, checkfirst=True)
+
+    known = {}
+    last_id = 0
+    while True:
+        rows = conn.execute(text(
+            "SELECT id, user_id, tags FROM tasks "
+            "WHERE id > :last_id AND tags IS NOT NULL AND tags <> '' ORDER BY id LIMIT 1000"
+        ), {'last_id': last_id}).all()
+        if not rows:
+            break
+
+        links = [(task_id, user_id, split_tags(tags)) for task_id, user_id, tags in rows]
+        new = sorted({(user_id, name) for _, user_id, names in links for name in names} - known.keys())
+        if new:
+            ids = conn.execute(
+                Tag.__table__.insert().returning(Tag.__table__.c.id, sort_by_parameter_order=True),
+                [{'user_id': user_id, 'name': name} for user_id, name in new]
+            ).scalars().all()
+            known.update(zip(new, ids))
+
+        task_rows = [
+            {'task_id': task_id, 'tag_id': known[(user_id, name)]}
+            for task_id, user_id, names in links for name in names
+        ]
+        if task_rows:
+            conn.execute(TaskTag.__table__.insert(), task_rows)
+        last_id = rows[-1][0]
+
+@migration('0013_search_index')
+def search_index(conn):
+    """tsvector + GIN on Postgres, FTS5 tables and triggers on SQLite"""
+    from app.search import create_search_index
+    create_search_index(conn)
+
+def applied_versions(engine):
+    """Versions already recorded, or an empty set before the first run"""
+    try:
+        with engine.connect() as conn:
+            return set(conn.execute(select(schema_migrations.c.version)).scalars())
+    except Exception:
+        return set()
+
+def pending_migrations(engine):
+    applied = applied_versions(engine)
+    return [(version, fn) for version, fn in MIGRATIONS if version not in applied]
+
+@contextmanager
+def migration_lock(engine):
+    """Cross-process lock: pg_advisory_lock on Postgres, a lock file elsewhere"""
+    if engine.dialect.name == 'postgresql':
+        with engine.connect() as conn:
+            conn.execute(text("SELECT pg_advisory_lock(:key)"), {'key': MIGRATION_LOCK_KEY})
+            conn.commit()
+            try:
+                yield
+            finally:
+                conn.execute(text("SELECT pg_advisory_unlock(:key)"), {'key': MIGRATION_LOCK_KEY})
+                conn.commit()
+    else:
+        import fcntl
+        digest = hashlib.md5(str(engine.url).encode('utf-8')).hexdigest()[:12]
+        path = os.path.join(tempfile.gettempdir(), f'planner-migrate-{digest}.lock')
+        with open(path, 'w') as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+def run_migrations():
+    """Apply pending migrations. Must be called inside an app context.
+
+    Returns the list of versions applied by this call.
+    """
+    engine = db.engine
+
+    # Fast path: nothing to do, no lock taken
+    if not pending_migrations(engine):
+        return []
+
+    applied = []
+    with migration_lock(engine):
+        migration_metadata.create_all(bind=engine)
+
+        # Another worker may have finished while we waited for the lock
+        for version, fn in pending_migrations(engine):
+            with engine.begin() as conn:
+                fn(conn)
+                conn.execute(schema_migrations.insert().values(
+                    version=version,
+                    applied_at=datetime.utcnow()
+                ))
+            print(f"✅ Applied migration {version}")
+            applied.append(version)
+
+    return applied
@@ -1,11 +1,14 @@
 from flask_sqlalchemy import SQLAlchemy
-from datetime import datetime
+from datetime import datetime, timedelta
 
 db = SQLAlchemy()
 
 class User(db.Model):
     """User model"""
     __tablename__ = 'users'
+    __table_args__ = (
+        db.Index('ix_users_total_xp', 'total_xp', 'id'),
+    )
 
     id = db.Column(db.Integer, primary_key=True)
     email = db.Column(db.String(255), unique=True, nullable=False, index=True)
@@ -21,12 +24,24 @@ class User(db.Model):
     tasks_completed = db.Column(db.Integer, default=0)
     total_xp = db.Column(db.Integer, default=0)
     planners_created = db.Column(db.Integer, default=0)
+    longest_streak = db.Column(db.Integer, default=0)
+    last_active_on = db.Column(db.Date)  # UTC day of the last task completion
+
+    # Bumped on every write to the user's rows; drives ETags
+    data_version = db.Column(db.Integer, default=0, nullable=False, server_default='0')
 
     # Relationships - use back_populates to avoid SQLAlchemy warnings
     planners = db.relationship('Planner', back_populates='user', lazy='dynamic', cascade='all,delete-orphan')
     tasks = db.relationship('Task', back_populates='user', lazy='dynamic', cascade='all,delete-orphan')
     user_achievements = db.relationship('UserAchievement', back_populates='user', lazy='dynamic', cascade='all,delete-orphan')
 
+    @property
+    def current_streak(self):
+        """Stored streak, or 0 once a full day has passed without a completion"""
+        if not self.last_active_on or self.last_active_on < datetime.utcnow().date() - timedelta(days=1):
+            return 0
+        return self.streak or 0
+
     def to_dict(self):
         return {
             'id': str(self.id),
@@ -35,7 +50,8 @@ class User(db.Model):
             'avatar_url': self.avatar,
             'level': self.level,
             'xp': self.xp,
-            'streak': self.streak,
+            'streak': self.current_streak,
+            'longest_streak': self.longest_streak or 0,
             'tasks_completed': self.tasks_completed,
             'planners_created': self.planners_created or 0,
             'achievements': [],
@@ -48,6 +64,10 @@ class User(db.Model):
 class Planner(db.Model):
     """Planner model (daily, weekly, monthly, projects, habits, goals)"""
     __tablename__ = 'planners'
+    __table_args__ = (
+        db.Index('ix_planners_user_created', 'user_id', 'created_at', 'id'),
+        db.Index('ix_planners_user_updated', 'user_id', 'updated_at'),
+    )
 
     id = db.Column(db.Integer, primary_key=True)
     user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
@@ -87,6 +107,15 @@ class Planner(db.Model):
 class Task(db.Model):
     """Task model"""
     __tablename__ = 'tasks'
+    __table_args__ = (
+        db.Index('ix_tasks_user_created', 'user_id', 'created_at', 'id'),
+        db.Index('ix_tasks_user_status', 'user_id', 'status'),
+        db.Index('ix_tasks_user_planner', 'user_id', 'planner_id'),
+        db.Index('ix_tasks_user_completed', 'user_id', 'completed_at'),
+        db.Index('ix_tasks_user_due', 'user_id', 'due_date'),
+        db.Index('ix_tasks_completed_at', 'completed_at'),
+        db.Index('ix_tasks_user_updated', 'user_id', 'updated_at'),
+    )
 
     id = db.Column(db.Integer, primary_key=True)
     user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
@@ -132,9 +161,33 @@ class Task(db.Model):
             'tags': self.tags.split(',') if self.tags else []
         }
 
+class Tag(db.Model):
+    """A user's tag name; linked to tasks through task_tags"""
+    __tablename__ = 'tags'
+    __table_args__ = (
+        db.Index('ux_tags_user_name', 'user_id', 'name', unique=True),
+    )
+
+    id = db.Column(db.Integer, primary_key=True)
+    user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
+    name = db.Column(db.String(100), nullable=False)
+
+class TaskTag(db.Model):
+    """Index of Task.tags: one row per (tag, task)"""
+    __tablename__ = 'task_tags'
+    __table_args__ = (
+        db.Index('ix_task_tags_task', 'task_id'),
+    )
+
+    tag_id = db.Column(db.Integer, db.ForeignKey('tags.id'), primary_key=True)
+    task_id = db.Column(db.Integer, db.ForeignKey('tasks.id'), primary_key=True)
+
 class Subtask(db.Model):
     """Subtask model"""
     __tablename__ = 'subtasks'
+    __table_args__ = (
+        db.Index('ix_subtasks_task_order', 'task_id', 'order'),
+    )
 
     id = db.Column(db.Integer, primary_key=True)
     task_id = db.Column(db.Integer, db.ForeignKey('tasks.id'), nullable=False)
@@ -142,6 +195,7 @@ class Subtask(db.Model):
     completed = db.Column(db.Boolean, default=False)
     order = db.Column(db.Integer, default=0)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
 
     def to_dict(self):
         return {
@@ -153,6 +207,58 @@ class Subtask(db.Model):
             'created_at': self.created_at.isoformat() if self.created_at else None
         }
 
+class DeletedRecord(db.Model):
+    """Tombstone for a hard-deleted row, read by /api/sync"""
+    __tablename__ = 'deleted_records'
+    __table_args__ = (
+        db.Index('ix_deleted_records_user_deleted', 'user_id', 'deleted_at'),
+    )
+
+    id = db.Column(db.Integer, primary_key=True)
+    user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
+    entity = db.Column(db.String(20), nullable=False)  # task, subtask, planner
+    entity_id = db.Column(db.Integer, nullable=False)
+    deleted_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
+
+class XpEvent(db.Model):
+    """Append-only XP ledger; users.xp, total_xp and level are derived from it"""
+    __tablename__ = 'xp_events'
+    __table_args__ = (
+        db.Index('ix_xp_events_user', 'user_id', 'id'),
+    )
+
+    id = db.Column(db.Integer, primary_key=True)
+    user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
+    amount = db.Column(db.Integer, nullable=False)
+    reason = db.Column(db.String(50), nullable=False)  # task_completed, achievement, opening_balance
+    source_id = db.Column(db.Integer)  # task or achievement id
+    created_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
+
+class DailyActivity(db.Model):
+    """Tasks completed per user per UTC day; streaks are computed from it"""
+    __tablename__ = 'daily_activity'
+
+    user_id = db.Column(db.Integer, db.ForeignKey('users.id'), primary_key=True)
+    day = db.Column(db.Date, primary_key=True)
+    tasks_completed = db.Column(db.Integer, default=0, nullable=False)
+
+class UserStats(db.Model):
+    """Materialized per-user task counters, kept up to date by the task routes"""
+    __tablename__ = 'user_stats'
+
+    user_id = db.Column(db.Integer, db.ForeignKey('users.id'), primary_key=True)
+    total_tasks = db.Column(db.Integer, default=0, nullable=False)
+    pending_tasks = db.Column(db.Integer, default=0, nullable=False)
+    in_progress_tasks = db.Column(db.Integer, default=0, nullable=False)
+    completed_tasks = db.Column(db.Integer, default=0, nullable=False)
+    cancelled_tasks = db.Column(db.Integer, default=0, nullable=False)
+    low_priority = db.Column(db.Integer, default=0, nullable=False)
+    medium_priority = db.Column(db.Integer, default=0, nullable=False)
+    high_priority = db.Column(db.Integer, default=0, nullable=False)
+    urgent_priority = db.Column(db.Integer, default=0, nullable=False)
+    total_planners = db.Column(db.Integer, default=0, nullable=False)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
 class Achievement(db.Model):
     """Achievement model"""
     __tablename__ = 'achievements'
@@ -181,6 +287,9 @@ class Achievement(db.Model):
 class UserAchievement(db.Model):
     """User Achievement junction"""
     __tablename__ = 'user_achievements'
+    __table_args__ = (
+        db.Index('ux_user_achievements_user_achievement', 'user_id', 'achievement_id', unique=True),
+    )
 
     id = db.Column(db.Integer, primary_key=True)
     user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
@@ -0,0 +1,38 @@
+"""
+XP Reconcile Script
+Rebuild users.xp, total_xp and level from the xp_events ledger
+
+Usage: python reconcile_xp.py [--chunk-size 1000]
+"""
+
+import argparse
+import sys
+import os
+import time
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from app import create_app
+
+def main():
+    parser = argparse.ArgumentParser(description='Rebuild XP counters from the xp_events ledger')
+    parser.add_argument('--chunk-size', type=int, default=1000, help='Users updated per transaction')
+    parser.add_argument('--config', default=os.getenv('FLASK_ENV', 'development'))
+    args = parser.parse_args()
+
+    from app.xp import reconcile
+
+    app = create_app(args.config)
+
+    with app.app_context():
+        start = time.perf_counter()
+        fixed = reconcile(chunk_size=args.chunk_size)
+        elapsed = time.perf_counter() - start
+
+        print("=" * 60)
+        print(f"✅ Reconciled XP in {elapsed:.1f}s, {fixed} users corrected")
+        print("=" * 60)
+
+if __name__ == '__main__':
+    main()
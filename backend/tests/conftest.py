@@ -0,0 +1,98 @@
+import os
+import sys
+
+import bcrypt
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app import create_app
+from app.achievements import init_achievements
+from app.gamification import get_catalog, invalidate_catalog, unlock
+from app.leaderboard import invalidate as invalidate_leaderboard
+from app.user_loader import load_user, user_cache
+from flask_jwt_extended import create_access_token, create_refresh_token
+from migrations import run_migrations
+from models import db, User, Planner, Task, Subtask
+from tests.query_budget import QueryBudget
+
+PASSWORD = 'test-password'
+PLANNERS = 5
+TASKS_PER_PLANNER = 3
+SUBTASKS_PER_TASK = 3
+
+@pytest.fixture
+def app():
+    """App on a fresh in-memory database with migrations and achievements applied"""
+    user_cache.clear()
+    invalidate_catalog()
+    invalidate_leaderboard()
+
+    app = create_app('testing')
+    with app.app_context():
+        run_migrations()
+        init_achievements()
+    yield app
+
+    with app.app_context():
+        db.session.remove()
+        db.engine.dispose()
+
+@pytest.fixture
+def client(app):
+    return app.test_client()
+
+@pytest.fixture
+def seeded(app):
+    """A user with several planners, tasks, subtasks and unlocked achievements,
+    plus a second user so leaderboards have more than one row"""
+    with app.app_context():
+        password_hash = bcrypt.hashpw(
+            PASSWORD.encode('utf-8'), bcrypt.gensalt(rounds=app.config['BCRYPT_ROUNDS'])
+        ).decode('utf-8')
+        user = User(email='user@planner.com', username='user', password_hash=password_hash)
+        other = User(email='other@planner.com', username='other', password_hash=password_hash, total_xp=500)
+        db.session.add_all([user, other])
+        db.session.flush()
+
+        planners = [Planner(user_id=user.id, name=f'Planner {i}', type='daily') for i in range(PLANNERS)]
+        db.session.add_all(planners)
+        db.session.flush()
+
+        tasks = [
+            Task(user_id=user.id, planner_id=planner.id, title=f'Task {planner.id}-{i}', xp_reward=10)
+            for planner in planners for i in range(TASKS_PER_PLANNER)
+        ]
+        db.session.add_all(tasks)
+        db.session.flush()
+        db.session.add_all([
+            Subtask(task_id=task.id, title=f'Subtask {i}', order=i)
+            for task in tasks for i in range(SUBTASKS_PER_TASK)
+        ])
+
+        achievement_ids = sorted(get_catalog().by_id)
+        unlock(user.id, achievement_ids[:3])
+        db.session.commit()
+
+        data = {
+            'user_id': user.id,
+            'planner_id': planners[0].id,
+            'task_id': tasks[0].id,
+            'subtask_id': tasks[0].subtasks.first().id,
+            'locked_achievement_id': achievement_ids[-1],
+            'headers': {'Authorization': f'Bearer {create_access_token(identity=str(user.id))}'},
+            'refresh_headers': {'Authorization': f'Bearer {create_refresh_token(identity=str(user.id))}'},
+        }
+
+        # Measure steady state: the catalog and the user cache are warm in a running worker
+        get_catalog()
+        load_user(user.id)
+        db.session.remove()
+        return data
+
+@pytest.fixture
+def query_budget(app):
+    """QueryBudget factory bound to the app's engine"""
+    def factory(max_statements, max_repeats=2):
+        return QueryBudget.for_app(app, max_statements, max_repeats)
+    return factory
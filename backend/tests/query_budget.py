@@ -0,0 +1,77 @@
+"""
+Query budget harness
+Counts the SQL statements an engine runs inside a block and fails when
+there are more than the budget allows, or when one statement shape (the
+SQL with parameters and IN lists collapsed) repeats more than
+`max_repeats` times, which is what an N+1 loop looks like.
+
+    with QueryBudget(engine, 4):
+        client.get('/api/tasks')
+
+    @QueryBudget.for_app(app, 4)
+    def load():
+        ...
+"""
+
+import re
+from collections import Counter
+from contextlib import ContextDecorator
+from sqlalchemy import event
+
+IN_LIST = re.compile(r'\((?:\s*\?\s*,)+\s*\?\s*\)|\((?:\s*%\(\w+\)s\s*,)+\s*%\(\w+\)s\s*\)')
+WHITESPACE = re.compile(r'\s+')
+
+def statement_shape(statement):
+    """Statement text with whitespace and expanded IN lists normalized"""
+    return IN_LIST.sub('(?...)', WHITESPACE.sub(' ', statement).strip())
+
+class QueryBudgetExceeded(AssertionError):
+    pass
+
+class QueryBudget(ContextDecorator):
+    """Fail the block when it runs more than `max_statements` SQL statements
+    or the same statement shape more than `max_repeats` times"""
+
+    def __init__(self, engine, max_statements, max_repeats=2):
+        self.engine = engine
+        self.max_statements = max_statements
+        self.max_repeats = max_repeats
+        self.statements = []
+
+    @classmethod
+    def for_app(cls, app, max_statements, max_repeats=2):
+        from models import db
+        with app.app_context():
+            return cls(db.engine, max_statements, max_repeats)
+
+    def _record(self, conn, cursor, statement, parameters, context, executemany):
+        self.statements.append(statement)
+
+    def __enter__(self):
+        self.statements = []
+        event.listen(self.engine, 'before_cursor_execute', self._record)
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        event.remove(self.engine, 'before_cursor_execute', self._record)
+        if exc_type is None:
+            self.check()
+        return False
+
+    @property
+    def repeated(self):
+        """Statement shapes that ran more than max_repeats times, with their counts"""
+        counts = Counter(statement_shape(s) for s in self.statements)
+        return {shape: n for shape, n in counts.items() if n > self.max_repeats}
+
+    def report(self):
+        return '\n'.join(f'  {i + 1:>3}. {statement_shape(s)}' for i, s in enumerate(self.statements))
+
+    def check(self):
+        problems = []
+        if len(self.statements) > self.max_statements:
+            problems.append(f'{len(self.statements)} SQL statements, budget is {self.max_statements}')
+        for shape, n in self.repeated.items():
+            problems.append(f'statement ran {n} times (limit {self.max_repeats}): {shape}')
+        if problems:
+            raise QueryBudgetExceeded('; '.join(problems) + '\n' + self.report())
@@ -0,0 +1,69 @@
+"""
+/api/tasks/batch: invalid operations answer 400 on their own while the
+valid ones in the same batch still commit.
+"""
+
+import pytest
+
+from models import db, User, Planner, Task
+
+@pytest.fixture
+def foreign_planner_id(app, seeded):
+    """A planner owned by the seeded second user"""
+    with app.app_context():
+        other = User.query.filter(User.id != seeded['user_id']).first()
+        planner = Planner(user_id=other.id, name='Not yours', type='daily')
+        db.session.add(planner)
+        db.session.commit()
+        return planner.id
+
+def test_invalid_operations_are_400s_next_to_a_commit(app, client, seeded, foreign_planner_id):
+    task_id = seeded['task_id']
+    with app.app_context():
+        original_title = db.session.get(Task, task_id).title
+
+    invalid = [
+        {'op': 'update', 'id': task_id, 'data': {'title': None}},
+        {'op': 'update', 'id': task_id, 'data': {'title': '   '}},
+        {'op': 'create', 'data': {'title': 'x', 'description': ['l']}},
+        {'op': 'create', 'data': {'title': 'x', 'duration': 'abc'}},
+        {'op': 'update', 'id': task_id, 'data': {'actual_time': True}},
+        {'op': 'update', 'id': task_id, 'data': {'priority': 'whenever'}},
+        {'op': 'update', 'id': task_id, 'data': {'status': 'done'}},
+        {'op': 'create', 'data': {'title': 'x', 'tags': ['a', 1]}},
+        {'op': 'create', 'data': {'title': 'x', 'tags': {'a': 1}}},
+        {'op': 'create', 'data': {'title': 'x', 'planner_id': foreign_planner_id}},
+        {'op': 'create', 'data': {'title': 'x', 'planner_id': '1'}},
+        {'op': 'create', 'data': {'title': 'x', 'date': 'tomorrow'}},
+        {'op': 'create', 'data': {'title': 'x', 'date': 20260101}},
+        {'op': 'create', 'data': 'x'},
+        {'op': 'toggle', 'id': str(task_id), 'completed': True},
+    ]
+    valid = [
+        {'op': 'create', 'data': {'title': 'Kept', 'planner_id': seeded['planner_id'], 'tags': ['a', 'b'], 'duration': 30}},
+        {'op': 'update', 'id': task_id, 'data': {'priority': 'high', 'description': None}},
+    ]
+
+    response = client.post('/api/tasks/batch', json={'operations': invalid + valid}, headers=seeded['headers'])
+
+    assert response.status_code == 200, response.get_data(as_text=True)
+    results = response.json['results']
+    assert [r['status'] for r in results[:len(invalid)]] == [400] * len(invalid)
+    assert all(r['error'] for r in results[:len(invalid)])
+    assert [r['status'] for r in results[len(invalid):]] == [201, 200]
+
+    with app.app_context():
+        kept = Task.query.filter_by(title='Kept').one()
+        assert (kept.planner_id, kept.tags, kept.estimated_time) == (seeded['planner_id'], 'a,b', 30)
+        task = db.session.get(Task, task_id)
+        assert (task.title, task.priority, task.status) == (original_title, 'high', 'pending')
+        assert Task.query.filter_by(title='x').count() == 0
+
+def test_unknown_and_missing_tasks_keep_their_own_statuses(client, seeded):
+    response = client.post('/api/tasks/batch', json={'operations': [
+        {'op': 'archive', 'id': seeded['task_id']},
+        {'op': 'delete', 'id': 999999},
+        {'op': 'toggle', 'id': seeded['task_id'], 'completed': True},
+    ]}, headers=seeded['headers'])
+
+    assert [r['status'] for r in response.json['results']] == [400, 404, 200]
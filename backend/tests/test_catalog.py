@@ -0,0 +1,59 @@
+"""
+Achievement catalog cache: dropped when an achievement change commits, never
+refilled with rows a concurrent change made stale, and reloaded after
+CATALOG_TTL for changes committed by other workers.
+"""
+
+from sqlalchemy import update
+
+from app import gamification
+from app.gamification import get_catalog
+from models import db, Achievement
+
+def rename_elsewhere(achievement_id, name):
+    """Commit the way another worker would: no ORM events in this process"""
+    with db.engine.begin() as conn:
+        conn.execute(update(Achievement.__table__).where(Achievement.__table__.c.id == achievement_id).values(name=name))
+
+def test_change_is_dropped_on_commit_not_flush(app):
+    with app.app_context():
+        catalog = get_catalog()
+        achievement = db.session.get(Achievement, catalog.ordered[0]['id'])
+        achievement.name = 'Renamed'
+        db.session.flush()
+        assert get_catalog() is catalog
+
+        db.session.commit()
+        assert get_catalog().by_id[achievement.id]['name'] == 'Renamed'
+
+def test_rolled_back_change_keeps_the_catalog(app):
+    with app.app_context():
+        catalog = get_catalog()
+        db.session.get(Achievement, catalog.ordered[0]['id']).name = 'Never committed'
+        db.session.flush()
+        db.session.rollback()
+        assert get_catalog() is catalog
+
+def test_load_racing_an_invalidation_is_not_cached(app, monkeypatch):
+    catalog_class = gamification.AchievementCatalog
+
+    def load_then_invalidate(achievements):
+        # A commit lands while this load is reading the old rows
+        gamification.invalidate_catalog()
+        return catalog_class(achievements)
+
+    with app.app_context():
+        gamification.invalidate_catalog()
+        monkeypatch.setattr(gamification, 'AchievementCatalog', load_then_invalidate)
+        first = get_catalog()
+        monkeypatch.setattr(gamification, 'AchievementCatalog', catalog_class)
+        assert get_catalog() is not first
+
+def test_other_workers_changes_show_up_after_the_ttl(app):
+    with app.app_context():
+        achievement_id = get_catalog().ordered[0]['id']
+        rename_elsewhere(achievement_id, 'From another worker')
+        assert get_catalog().by_id[achievement_id]['name'] != 'From another worker'
+
+        app.config['CATALOG_TTL'] = 0
+        assert get_catalog().by_id[achievement_id]['name'] == 'From another worker'
@@ -0,0 +1,49 @@
+"""
+Conditional GETs: an ETag must never be sent with a payload older than it,
+and a 304 must only be answered while the payload is unchanged.
+"""
+
+from sqlalchemy import update
+
+from models import db, Achievement, User
+
+def commit_elsewhere(app, user_id, **values):
+    """Write a user row the way another worker would: no session, no cache eviction here"""
+    with app.app_context():
+        with db.engine.begin() as conn:
+            conn.execute(
+                update(User.__table__).where(User.__table__.c.id == user_id)
+                .values(data_version=User.__table__.c.data_version + 1, **values)
+            )
+
+def test_stats_reload_a_user_changed_by_another_worker(app, client, seeded):
+    first = client.get('/api/user/stats', headers=seeded['headers'])
+    xp = first.json['user']['xp']
+
+    commit_elsewhere(app, seeded['user_id'], xp=xp + 40)
+
+    response = client.get('/api/user/stats', headers={**seeded['headers'], 'If-None-Match': first.headers['ETag']})
+    assert response.status_code == 200
+    assert response.json['user']['xp'] == xp + 40
+    assert response.headers['ETag'] != first.headers['ETag']
+
+    revalidated = client.get('/api/user/stats', headers={**seeded['headers'], 'If-None-Match': response.headers['ETag']})
+    assert revalidated.status_code == 304
+
+def test_unchanged_stats_answer_304(client, seeded):
+    first = client.get('/api/user/stats', headers=seeded['headers'])
+    response = client.get('/api/user/stats', headers={**seeded['headers'], 'If-None-Match': first.headers['ETag']})
+    assert response.status_code == 304
+
+def test_achievement_catalog_change_invalidates_the_etag(app, client, seeded):
+    first = client.get('/api/achievements', headers=seeded['headers'])
+
+    with app.app_context():
+        achievement = db.session.get(Achievement, first.json['achievements'][0]['id'])
+        achievement.description = 'Reworded'
+        db.session.commit()
+
+    response = client.get('/api/achievements', headers={**seeded['headers'], 'If-None-Match': first.headers['ETag']})
+    assert response.status_code == 200
+    assert response.json['achievements'][0]['description'] == 'Reworded'
+    assert response.headers['ETag'] != first.headers['ETag']
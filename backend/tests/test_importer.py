@@ -0,0 +1,96 @@
+"""
+/api/import: row validation, export round trips and chunked commits.
+"""
+
+import json
+
+import pytest
+
+from app.importer import Importer
+from flask_jwt_extended import create_access_token
+from models import Planner, Task, Subtask
+
+def post_ndjson(client, headers, lines):
+    body = '\n'.join(line if isinstance(line, str) else json.dumps(line) for line in lines)
+    return client.post('/api/import', data=body, headers={**headers, 'Content-Type': 'application/x-ndjson'})
+
+def counts(app, user_id):
+    with app.app_context():
+        return (
+            Planner.query.filter_by(user_id=user_id).count(),
+            Task.query.filter_by(user_id=user_id).count(),
+            Subtask.query.join(Task).filter(Task.user_id == user_id).count(),
+        )
+
+@pytest.mark.parametrize('line, error', [
+    ('{"title": "x", "description": {"a": 1}}', 'Task description must be a string'),
+    ('{"type": "planner", "name": "P", "description": ["a"]}', 'Planner description must be a string'),
+    ('{"title": "x", "estimated_time": 1e400}', 'Invalid estimated_time: inf'),
+    ('{"title": "x", "estimated_time": true}', 'Invalid estimated_time: True'),
+    ('{"title": "x", "actual_time": 99999999999}', 'actual_time is out of range: 99999999999'),
+    ('{"title": {"a": 1}}', 'Task title must be a string'),
+    ('{"title": "x", "tags": "' + 'a,' * 300 + '"}', 'tags is longer than 500 characters'),
+    ('{"type": "planner", "data": {"name": "P", "type": "' + 't' * 51 + '"}}',
+     'Planner type is longer than 50 characters'),
+])
+def test_bad_rows_are_row_errors(app, client, seeded, line, error):
+    before = counts(app, seeded['user_id'])
+    response = post_ndjson(client, seeded['headers'], [{'title': 'good'}, line])
+
+    assert response.status_code == 200, response.get_data(as_text=True)
+    assert response.json['errors'] == [{'line': 2, 'error': error}]
+    assert response.json['tasks_created'] == 1
+    assert counts(app, seeded['user_id'])[1] == before[1] + 1
+
+def test_rejected_task_does_not_create_its_planner(app, client, seeded):
+    before = counts(app, seeded['user_id'])
+    response = post_ndjson(client, seeded['headers'], [{'title': 'x', 'planner': 'Ghost', 'due_date': 'nope'}])
+
+    assert response.json['error_count'] == 1
+    assert counts(app, seeded['user_id']) == before
+
+def test_export_round_trip_remaps_subtasks_and_skips_other_lines(app, client, seeded):
+    exported = client.get('/api/export', headers=seeded['headers']).get_data(as_text=True)
+    kinds = [json.loads(line)['type'] for line in exported.splitlines()]
+
+    registered = client.post('/api/auth/register', json={'email': 'copy@planner.com', 'username': 'copy', 'password': 'secret123'})
+    copy_id = registered.json['user']['id']
+    with app.app_context():
+        headers = {'Authorization': f'Bearer {create_access_token(identity=str(copy_id))}'}
+
+    response = post_ndjson(client, headers, exported.splitlines())
+
+    assert response.status_code == 200
+    assert response.json['error_count'] == 0
+    assert response.json['records_skipped'] == kinds.count('user') + kinds.count('achievement')
+    assert response.json['planners_created'] == kinds.count('planner')
+    assert response.json['tasks_created'] == kinds.count('task')
+    assert response.json['subtasks_created'] == kinds.count('subtask')
+
+    with app.app_context():
+        def shape(user_id):
+            tasks = Task.query.filter_by(user_id=user_id).order_by(Task.title).all()
+            return [
+                (t.title, t.planner.name if t.planner else None, sorted(s.title for s in t.subtasks))
+                for t in tasks
+            ]
+        assert shape(copy_id) == shape(seeded['user_id'])
+
+def test_subtask_of_unknown_task_is_a_row_error(client, seeded):
+    response = post_ndjson(client, seeded['headers'], [{'type': 'subtask', 'data': {'task_id': 999, 'title': 'x'}}])
+    assert response.json['errors'] == [{'line': 1, 'error': 'Unknown task_id: 999'}]
+
+def test_subtasks_follow_their_task_across_chunks(app, seeded):
+    lines = []
+    for i in range(3):
+        lines.append({'type': 'task', 'data': {'id': 100 + i, 'title': f'chunked {i}'}})
+        lines.append({'type': 'subtask', 'data': {'task_id': 100 + i, 'title': f'step {i}', 'completed': True}})
+
+    with app.app_context():
+        rows = Importer(seeded['user_id'], chunk_size=2)
+        for line_no, record in enumerate(lines, start=1):
+            rows.add(line_no, record)
+        assert rows.finish()['subtasks_created'] == 3
+
+        task = Task.query.filter_by(title='chunked 2').one()
+        assert [(s.title, s.completed) for s in task.subtasks] == [('step 2', True)]
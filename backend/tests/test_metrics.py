@@ -0,0 +1,39 @@
+"""
+/metrics and /api/metrics/pool: open in development and testing, token-only
+everywhere else.
+"""
+
+import pytest
+
+PATHS = ('/metrics', '/api/metrics/pool')
+
+@pytest.fixture
+def production(app):
+    """The test app with DEBUG and TESTING off, as a deployed worker runs"""
+    app.config.update(TESTING=False, DEBUG=False, METRICS_TOKEN=None)
+    return app
+
+@pytest.mark.parametrize('path', PATHS)
+def test_open_while_testing_without_a_token(client, path):
+    assert client.get(path).status_code == 200
+
+@pytest.mark.parametrize('path', PATHS)
+def test_closed_in_production_without_a_token(production, client, path):
+    response = client.get(path)
+    assert response.status_code == 401
+    assert response.json == {'error': 'Missing or invalid metrics token'}
+
+@pytest.mark.parametrize('path', PATHS)
+def test_token_is_required_when_set(production, client, path):
+    production.config['METRICS_TOKEN'] = 's3cret'
+
+    assert client.get(path).status_code == 401
+    assert client.get(path, headers={'X-Metrics-Token': 'wrong'}).status_code == 401
+    assert client.get(path, headers={'X-Metrics-Token': 's3cret'}).status_code == 200
+
+def test_metrics_report_served_requests(client, seeded):
+    client.get('/api/tasks', headers=seeded['headers'])
+
+    body = client.get('/metrics').get_data(as_text=True)
+    assert 'http_requests_total{blueprint="tasks",endpoint="tasks.get_tasks",method="GET",status="200"}' in body
+    assert 'db_pool_checkouts_total' in body
@@ -0,0 +1,104 @@
+"""
+SQL statement budgets for every route of the auth, planners, tasks, user
+and achievements blueprints. Each request runs against the seeded data in
+conftest.py (several planners, tasks, subtasks and unlocked achievements),
+so a per-row lazy load shows up as a repeated statement and fails.
+
+When a change legitimately needs more statements, raise the budget here
+in the same commit and say why in its message.
+"""
+
+import pytest
+
+from models import UserAchievement
+from tests.conftest import PASSWORD
+from tests.query_budget import QueryBudgetExceeded
+
+BLUEPRINTS = ('auth', 'planners', 'tasks', 'user', 'achievements')
+
+def route(method, path, budget, status=200, json=None, headers='headers'):
+    return {'method': method, 'path': path, 'budget': budget, 'status': status, 'json': json, 'headers': headers}
+
+# endpoint -> request against the seeded data and its statement budget.
+# Paths are formatted with the seeded ids.
+ROUTES = {
+    'auth.register': route('POST', '/api/auth/register', 4, 201, headers=None,
+                           json={'email': 'new@planner.com', 'username': 'new', 'password': 'secret123'}),
+    'auth.login': route('POST', '/api/auth/login', 1, headers=None,
+                        json={'email': 'user@planner.com', 'password': PASSWORD}),
+    'auth.get_current_user': route('GET', '/api/auth/me', 0),
+    'auth.refresh': route('POST', '/api/auth/refresh', 0, headers='refresh_headers'),
+
+    'planners.get_planners': route('GET', '/api/planners', 2),
+    'planners.create_planner': route('POST', '/api/planners', 8, 201, json={'name': 'Week', 'type': 'weekly'}),
+    'planners.get_planner': route('GET', '/api/planners/{planner_id}', 1),
+    'planners.update_planner': route('PUT', '/api/planners/{planner_id}', 4, json={'name': 'Renamed'}),
+    'planners.delete_planner': route('DELETE', '/api/planners/{planner_id}', 10),
+
+    'tasks.get_tasks': route('GET', '/api/tasks', 2),
+    'tasks.create_task': route('POST', '/api/tasks', 7, 201, json={'title': 'New task', 'tags': 'work, home'}),
+    'tasks.get_task': route('GET', '/api/tasks/{task_id}', 2),
+    'tasks.update_task': route('PUT', '/api/tasks/{task_id}', 9, json={'title': 'Renamed', 'status': 'completed'}),
+    'tasks.delete_task': route('DELETE', '/api/tasks/{task_id}', 8),
+    'tasks.toggle_task': route('PATCH', '/api/tasks/{task_id}/toggle', 9, json={'completed': True}),
+    'tasks.batch_tasks': route('POST', '/api/tasks/batch', 10, json={'operations': [
+        {'op': 'create', 'data': {'title': 'Batch 1'}},
+        {'op': 'create', 'data': {'title': 'Batch 2'}},
+        {'op': 'toggle', 'id': '{task_id}', 'completed': True},
+        {'op': 'update', 'id': '{task_id}', 'data': {'priority': 'high'}},
+    ]}),
+    'tasks.create_subtask': route('POST', '/api/tasks/{task_id}/subtasks', 5, 201, json={'title': 'Step'}),
+    'tasks.toggle_subtask': route('PATCH', '/api/tasks/{task_id}/subtasks/{subtask_id}/toggle', 6),
+    'tasks.delete_subtask': route('DELETE', '/api/tasks/{task_id}/subtasks/{subtask_id}', 6),
+
+    'user.get_user_stats': route('GET', '/api/user/stats', 2),
+    'user.get_profile': route('GET', '/api/user/profile', 0),
+    'user.update_profile': route('PUT', '/api/user/profile', 3, json={'username': 'renamed'}),
+    'user.get_leaderboard': route('GET', '/api/user/leaderboard', 5),
+
+    'achievements.initialize_achievements': route('POST', '/api/achievements/init', 1, headers=None),
+    'achievements.get_achievements': route('GET', '/api/achievements', 2),
+    'achievements.check_achievements': route('POST', '/api/achievements/check', 10),
+    'achievements.get_user_achievements': route('GET', '/api/achievements/user', 1),
+    'achievements.unlock_achievement': route('POST', '/api/achievements/{locked_achievement_id}/unlock', 5),
+    'achievements.get_leaderboard': route('GET', '/api/achievements/leaderboard', 5),
+}
+
+def fill(value, seeded):
+    """Format seeded ids into a path or JSON payload; '{task_id}' alone becomes an int"""
+    if isinstance(value, str):
+        if value.startswith('{') and value.endswith('}') and value[1:-1] in seeded:
+            return seeded[value[1:-1]]
+        return value.format(**seeded)
+    if isinstance(value, list):
+        return [fill(v, seeded) for v in value]
+    if isinstance(value, dict):
+        return {k: fill(v, seeded) for k, v in value.items()}
+    return value
+
+def test_every_route_has_a_budget(app):
+    endpoints = {
+        rule.endpoint for rule in app.url_map.iter_rules()
+        if rule.endpoint.split('.')[0] in BLUEPRINTS
+    }
+    assert endpoints - ROUTES.keys() == set(), 'add a budget to ROUTES for new routes'
+    assert ROUTES.keys() - endpoints == set(), 'remove budgets for routes that no longer exist'
+
+@pytest.mark.parametrize('endpoint', sorted(ROUTES))
+def test_route_within_query_budget(endpoint, client, seeded, query_budget):
+    spec = ROUTES[endpoint]
+    headers = seeded[spec['headers']] if spec['headers'] else None
+
+    with query_budget(spec['budget']):
+        response = client.open(
+            fill(spec['path'], seeded), method=spec['method'], json=fill(spec['json'], seeded), headers=headers
+        )
+
+    assert response.status_code == spec['status'], response.get_data(as_text=True)
+
+def test_budget_catches_a_lazy_load_per_row(app, seeded, query_budget):
+    with app.app_context():
+        rows = UserAchievement.query.filter_by(user_id=seeded['user_id']).all()
+        with pytest.raises(QueryBudgetExceeded, match='ran 3 times'):
+            with query_budget(10):
+                [row.to_dict() for row in rows]
@@ -0,0 +1,75 @@
+"""
+Materialized user_stats: a task written while the row is being built must
+still be counted. Runs on a SQLite file so the builder and the writer hold
+separate connections.
+"""
+
+import threading
+import time
+
+import pytest
+
+from app import create_app, stats
+from app.achievements import init_achievements
+from config import Testing, engine_options
+from migrations import run_migrations
+from models import db, Task, UserStats
+
+@pytest.fixture
+def app(tmp_path, monkeypatch):
+    """The conftest app, on a database file instead of a shared in-memory connection"""
+    uri = f'sqlite:///{tmp_path / "stats.db"}'
+    monkeypatch.setattr(Testing, 'SQLALCHEMY_DATABASE_URI', uri)
+    monkeypatch.setattr(Testing, 'SQLALCHEMY_ENGINE_OPTIONS', engine_options(
+        uri, pool_size=5, max_overflow=5, pool_timeout=10, pool_recycle=1800
+    ))
+
+    app = create_app('testing')
+    app.config['MATERIALIZED_STATS'] = True
+    with app.app_context():
+        run_migrations()
+        init_achievements()
+    yield app
+
+    with app.app_context():
+        db.session.remove()
+        db.engine.dispose()
+
+def test_task_created_during_the_build_is_counted(app, seeded, monkeypatch):
+    building = threading.Event()
+    aggregate_counts = stats.aggregate_counts
+
+    def slow_aggregate(user_id):
+        counts = aggregate_counts(user_id)
+        building.set()
+        # Give a concurrent writer the chance to commit between read and insert
+        time.sleep(0.3)
+        return counts
+
+    monkeypatch.setattr(stats, 'aggregate_counts', slow_aggregate)
+
+    def create_task():
+        building.wait(5)
+        app.test_client().post('/api/tasks', json={'title': 'Mid-build'}, headers=seeded['headers'])
+
+    writer = threading.Thread(target=create_task)
+    writer.start()
+    response = app.test_client().get('/api/user/stats', headers=seeded['headers'])
+    writer.join(10)
+
+    assert response.status_code == 200
+    with app.app_context():
+        total = Task.query.filter_by(user_id=seeded['user_id']).count()
+        assert Task.query.filter_by(title='Mid-build').count() == 1
+        assert db.session.get(UserStats, seeded['user_id']).total_tasks == total
+
+def test_counters_follow_writes_once_built(app, client, seeded):
+    before = client.get('/api/user/stats', headers=seeded['headers']).json['stats']
+
+    client.post('/api/tasks', json={'title': 'One more', 'priority': 'high'}, headers=seeded['headers'])
+    client.patch(f"/api/tasks/{seeded['task_id']}/toggle", json={'completed': True}, headers=seeded['headers'])
+
+    after = client.get('/api/user/stats', headers=seeded['headers']).json['stats']
+    assert after['total_tasks'] == before['total_tasks'] + 1
+    assert after['completed_tasks'] == before['completed_tasks'] + 1
+    assert after['priority_distribution'].get('high', 0) == before['priority_distribution'].get('high', 0) + 1
@@ -0,0 +1,80 @@
+"""
+/api/sync deltas: tombstones for every row a delete cascades to, and no
+tombstone for an id SQLite has already handed to a new row.
+"""
+
+import time
+from datetime import timedelta
+
+import pytest
+
+from app import sync as sync_module
+
+@pytest.fixture(autouse=True)
+def no_overlap(monkeypatch):
+    # Tokens normally reach 5 s into the past; exact windows keep deltas small
+    monkeypatch.setattr(sync_module, 'SYNC_OVERLAP', timedelta(0))
+
+def sync(client, headers, token=None):
+    response = client.get('/api/sync' + (f'?since={token}' if token else ''), headers=headers)
+    assert response.status_code == 200, response.get_data(as_text=True)
+    return response.json
+
+def checkpoint(client, headers):
+    token = sync(client, headers)['token']
+    time.sleep(0.01)
+    return token
+
+def test_full_sync_returns_the_rows_as_their_endpoints_do(client, seeded):
+    full = sync(client, seeded['headers'])
+    task = client.get(f"/api/tasks/{seeded['task_id']}", headers=seeded['headers']).json
+
+    assert full['full'] is True
+    synced = next(t for t in full['tasks'] if t['id'] == seeded['task_id'])
+    assert synced == {k: v for k, v in task.items() if k in synced}
+    assert sorted(s['id'] for s in full['subtasks'] if s['task_id'] == seeded['task_id']) == \
+        sorted(s['id'] for s in task['subtasks'])
+    assert len(full['planners']) == 5
+
+def test_tombstone_is_dropped_when_its_id_is_reused(client, seeded):
+    headers = seeded['headers']
+    newest = client.post('/api/tasks', json={'title': 'Newest'}, headers=headers).json['id']
+    token = checkpoint(client, headers)
+
+    client.delete(f'/api/tasks/{newest}', headers=headers)
+    between = sync(client, headers, token)
+    assert between['deleted']['tasks'] == [newest]
+
+    reused = client.post('/api/tasks', json={'title': 'Reused'}, headers=headers).json['id']
+    assert reused == newest  # SQLite reuses the max rowid
+
+    delta = sync(client, headers, token)
+    assert [t['title'] for t in delta['tasks'] if t['id'] == reused] == ['Reused']
+    assert reused not in delta['deleted']['tasks']
+
+    after = sync(client, headers, between['token'])
+    assert reused not in after['deleted']['tasks']
+
+def test_deleting_a_task_tombstones_its_subtasks(client, seeded):
+    headers = seeded['headers']
+    subtasks = client.get(f"/api/tasks/{seeded['task_id']}", headers=headers).json['subtasks']
+    token = checkpoint(client, headers)
+
+    client.delete(f"/api/tasks/{seeded['task_id']}", headers=headers)
+
+    deleted = sync(client, headers, token)['deleted']
+    assert deleted['tasks'] == [seeded['task_id']]
+    assert sorted(deleted['subtasks']) == sorted(s['id'] for s in subtasks)
+
+def test_deleting_a_planner_tombstones_its_tasks_and_subtasks(client, seeded):
+    headers = seeded['headers']
+    tasks = client.get(f"/api/tasks?planner_id={seeded['planner_id']}&include=subtasks", headers=headers).json
+    token = checkpoint(client, headers)
+
+    client.delete(f"/api/planners/{seeded['planner_id']}", headers=headers)
+
+    deleted = sync(client, headers, token)['deleted']
+    assert deleted['planners'] == [seeded['planner_id']]
+    assert sorted(deleted['tasks']) == sorted(t['id'] for t in tasks)
+    assert sorted(deleted['subtasks']) == sorted(s['id'] for t in tasks for s in t['subtasks'])
+    assert deleted['subtasks']